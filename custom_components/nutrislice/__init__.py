@@ -5,11 +5,25 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
+from . import websocket_api
 from .const import CONF_DISTRICT, CONF_MEAL_TYPE, CONF_SCHOOL_NAME, DOMAIN
 from .coordinator import NutrisliceDataUpdateCoordinator
+from .history import get_menu_history
+from .services import async_setup_services
 
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.CALENDAR, Platform.SENSOR]
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Nutrislice integration."""
+    websocket_api.async_setup(hass)
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -23,18 +37,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         meal_type=entry.data[CONF_MEAL_TYPE],
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    # Start from the last known menu when we have one, so setup does not wait
+    # on Nutrislice. The real refresh then happens shortly after, at a
+    # different time for each entry so a restart does not send every request
+    # at once.
+    if await coordinator.async_restore():
+        coordinator.update_interval = coordinator.startup_delay
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the archived menus of a deleted config entry."""
+    await get_menu_history(hass).async_remove_entry(entry.entry_id)
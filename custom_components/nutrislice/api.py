@@ -0,0 +1,458 @@
+"""Shared access to the Nutrislice JSON API."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from functools import partial
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp import hdrs
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .const import (
+    API_BASE_URL,
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    DATA_FETCH_REGISTRY,
+    DOMAIN,
+    FETCH_CACHE_TTL,
+    FETCH_RETRIES,
+    FETCH_RETRY_BACKOFF,
+    FETCH_RETRY_BACKOFF_MAX,
+    MAX_REQUESTS_PER_HOST,
+    REQUEST_TIMEOUT,
+    STORAGE_KEY_WEEKS,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    WEEK_CACHE_RETENTION,
+)
+from .model import WeekPayload, project_week
+
+_LOGGER = logging.getLogger(__name__)
+
+# Statuses worth retrying, the API may answer the next request
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def week_start(day: date) -> date:
+    """Return the Sunday starting the Nutrislice week that contains the given day."""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def week_url(district: str, school_name: str, meal_type: str, day: date) -> str:
+    """Return the API URL of the week containing the given day.
+
+    Nutrislice returns the whole week for any date in it, so the URL is built
+    from the start of the week to give every day of a week the same URL.
+    """
+    start = week_start(day)
+    base_url = API_BASE_URL.format(district=district)
+    return f"{base_url}/menu/api/weeks/school/{school_name}/menu-type/{meal_type}/{start.strftime('%Y/%m/%d')}/?format=json"
+
+
+def schools_url(district: str) -> str:
+    """Return the API URL listing the schools of a district."""
+    return f"{API_BASE_URL.format(district=district)}/menu/api/schools/?format=json"
+
+
+def _retry_delay(attempt: int) -> float:
+    """Return the delay before a retry, with exponential backoff and full jitter.
+
+    The jitter keeps entries that failed together from retrying together.
+    """
+    return random.uniform(
+        0, min(FETCH_RETRY_BACKOFF * 2 ** (attempt - 1), FETCH_RETRY_BACKOFF_MAX)
+    )
+
+
+def _conditional_headers(stored: dict[str, Any] | None) -> dict[str, str]:
+    """Return the headers asking for a stored week only if it changed."""
+    headers = {}
+    if stored is not None:
+        if stored.get("etag"):
+            headers[hdrs.IF_NONE_MATCH] = stored["etag"]
+        if stored.get("last_modified"):
+            headers[hdrs.IF_MODIFIED_SINCE] = stored["last_modified"]
+    return headers
+
+
+def get_fetch_registry(hass: HomeAssistant) -> NutrisliceFetchRegistry:
+    """Return the fetch registry shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_FETCH_REGISTRY not in domain_data:
+        domain_data[DATA_FETCH_REGISTRY] = NutrisliceFetchRegistry(hass)
+    return domain_data[DATA_FETCH_REGISTRY]
+
+
+class NutrisliceApiError(HomeAssistantError):
+    """Error to indicate the API did not return a week."""
+
+    def __init__(self, status: int) -> None:
+        """Initialize with the HTTP status returned by the API."""
+        super().__init__(f"Nutrislice API returned status {status}")
+        self.status = status
+
+
+class NutrisliceUnavailableError(HomeAssistantError):
+    """Error to indicate requests to a district API are suspended."""
+
+    def __init__(self, district: str) -> None:
+        """Initialize with the district whose API is failing."""
+        super().__init__(f"Nutrislice API of {district} is unavailable")
+        self.district = district
+
+
+class CircuitBreaker:
+    """Stop sending requests to an API that keeps failing.
+
+    After a number of consecutive failures the breaker opens and requests are
+    refused for a cooldown. A single request is then let through: it closes
+    the breaker if it succeeds and opens it again otherwise.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_FAILURE_THRESHOLD,
+        cooldown: timedelta = BREAKER_COOLDOWN,
+    ) -> None:
+        """Initialize the breaker, closed."""
+        self._threshold = threshold
+        self._cooldown = cooldown.total_seconds()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while requests are refused."""
+        return self._opened_at is not None
+
+    def allow_request(self) -> bool:
+        """Return True if a request can be sent."""
+        if self._opened_at is None:
+            return True
+        if time.monotonic() - self._opened_at < self._cooldown or self._trial:
+            return False
+        self._trial = True
+        return True
+
+    def end_trial(self) -> None:
+        """Let another request through if the trial one did not settle."""
+        self._trial = False
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful request."""
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the breaker at the threshold."""
+        self._failures += 1
+        self._trial = False
+        if self._failures >= self._threshold:
+            self._opened_at = time.monotonic()
+
+
+@dataclass(slots=True)
+class FetchStats:
+    """Counters and timings of the requests for a week."""
+
+    # Answered from memory, storage or a request already in flight
+    cache_hits: int = 0
+    # Sent to the API, retries included
+    requests: int = 0
+    not_modified: int = 0
+    retries: int = 0
+    errors: int = 0
+    # Of the last successful request, in seconds and bytes
+    latency: float | None = None
+    payload_bytes: int | None = None
+    decode_time: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the stats for diagnostics."""
+        return asdict(self)
+
+
+class NutrisliceFetchRegistry:
+    """Coalesce week requests across all config entries.
+
+    Entries for the same school (lunch and breakfast, or a re-added entry) and
+    schools of the same district often ask for the same weeks. Identical
+    requests that are in flight are merged into one, and results are shared
+    for a short time so N entries cost one request per distinct URL.
+
+    Week payloads are also kept on disk. Refreshes send conditional requests
+    and reuse the stored body when the API answers 304, and weeks that are
+    already over are served from storage without touching the network.
+
+    Failed requests are retried a few times with jittered exponential backoff.
+    Each district has a circuit breaker shared by its entries, so an API that
+    is down is left alone for a while instead of being retried by every entry.
+    Requests in flight to a host are capped, however many entries refresh.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self._hass = hass
+        self._session = async_get_clientsession(hass)
+        self._inflight: dict[str, asyncio.Task[WeekPayload]] = {}
+        # URL -> (monotonic fetch time, payload or HTTP error status)
+        self._results: dict[str, tuple[float, WeekPayload | int]] = {}
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, STORAGE_KEY_WEEKS
+        )
+        self._load_lock = asyncio.Lock()
+        # URL -> {"week_start", "etag", "last_modified", "data"}
+        self._weeks: dict[str, dict[str, Any]] | None = None
+        self._breakers: dict[str, CircuitBreaker] = {}
+        # URL -> (week start, stats)
+        self._stats: dict[str, tuple[date, FetchStats]] = {}
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+
+    async def async_get_week(
+        self,
+        district: str,
+        school_name: str,
+        meal_type: str,
+        day: date,
+        *,
+        remember: bool = True,
+    ) -> WeekPayload:
+        """Return the payload of the week containing the given day.
+
+        Raises NutrisliceApiError when the API does not return the week, and
+        NutrisliceUnavailableError while the district API is left alone. The
+        returned payload is shared between entries and must not be modified.
+        One-off reads of many weeks, like exports, pass remember=False so the
+        results they fetch are not kept for other callers.
+        """
+        url = week_url(district, school_name, meal_type, day)
+        stats = self.get_stats(url, week_start(day))
+        cached = self._results.get(url)
+        if cached is not None:
+            fetched_at, result = cached
+            if time.monotonic() - fetched_at < FETCH_CACHE_TTL.total_seconds():
+                stats.cache_hits += 1
+                if isinstance(result, int):
+                    raise NutrisliceApiError(result)
+                return result
+            del self._results[url]
+
+        # Join the request in flight, a finished one may not be popped yet
+        if (task := self._inflight.get(url)) is not None and not task.done():
+            stats.cache_hits += 1
+        else:
+            task = self._hass.async_create_background_task(
+                self._async_fetch(url, district, week_start(day), remember),
+                name=f"{DOMAIN} fetch {url}",
+            )
+            self._inflight[url] = task
+            task.add_done_callback(partial(self._forget_inflight, url))
+
+        # Shield the shared request so one cancelled caller does not cancel it
+        # for the other entries waiting on it.
+        return await asyncio.shield(task)
+
+    @callback
+    def _forget_inflight(self, url: str, task: asyncio.Task[WeekPayload]) -> None:
+        """Drop a finished request, unless a newer one replaced it."""
+        if self._inflight.get(url) is task:
+            del self._inflight[url]
+
+    async def async_get_stored_week(
+        self, district: str, school_name: str, meal_type: str, day: date
+    ) -> WeekPayload | None:
+        """Return the stored payload of the week containing the given day, if any."""
+        weeks = await self._async_load()
+        stored = weeks.get(week_url(district, school_name, meal_type, day))
+        return None if stored is None else stored["data"]
+
+    def get_stats(self, url: str, start: date) -> FetchStats:
+        """Return the request stats of a week URL.
+
+        Stats are only kept for weeks within WEEK_CACHE_RETENTION of today,
+        the ones of other weeks are dropped when new weeks are tracked.
+        """
+        if (known := self._stats.get(url)) is not None:
+            return known[1]
+        today = dt_util.now().date()
+        for key in [
+            key
+            for key, (week, _) in self._stats.items()
+            if abs(week - today) > WEEK_CACHE_RETENTION
+        ]:
+            del self._stats[key]
+        stats = FetchStats()
+        self._stats[url] = (start, stats)
+        return stats
+
+    def get_breaker(self, district: str) -> CircuitBreaker:
+        """Return the circuit breaker of a district API."""
+        if (breaker := self._breakers.get(district)) is None:
+            breaker = self._breakers[district] = CircuitBreaker()
+        return breaker
+
+    async def _async_fetch(
+        self, url: str, district: str, start: date, remember: bool
+    ) -> WeekPayload:
+        """Fetch a week, remembering the result if asked to."""
+        try:
+            payload = await self._async_fetch_week(url, district, start)
+        except NutrisliceApiError as err:
+            if remember:
+                self._remember(url, err.status)
+            raise
+        if remember:
+            self._remember(url, payload)
+        return payload
+
+    async def _async_fetch_week(
+        self, url: str, district: str, start: date
+    ) -> WeekPayload:
+        """Fetch a week from storage or the API.
+
+        Weeks older than WEEK_CACHE_RETENTION are not stored, they would be
+        dropped on the next save anyway.
+        """
+        weeks = await self._async_load()
+        stored = weeks.get(url)
+        stats = self.get_stats(url, start)
+
+        # A week that is over will not change anymore.
+        if stored is not None and start + timedelta(days=7) <= dt_util.now().date():
+            stats.cache_hits += 1
+            return stored["data"]
+
+        breaker = self.get_breaker(district)
+        if not breaker.allow_request():
+            raise NutrisliceUnavailableError(district)
+
+        try:
+            status, payload, etag, last_modified = await self._async_request(
+                url, _conditional_headers(stored), stats
+            )
+        except (aiohttp.ClientError, TimeoutError):
+            stats.errors += 1
+            breaker.record_failure()
+            raise
+        finally:
+            # A cancelled trial request must not keep the breaker shut
+            breaker.end_trial()
+        if status in RETRY_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        if status == 304 and stored is not None:
+            stats.not_modified += 1
+            return stored["data"]
+        if payload is None:
+            stats.errors += 1
+            _LOGGER.debug("%s returned status %s", url, status)
+            raise NutrisliceApiError(status)
+
+        if start >= dt_util.now().date() - WEEK_CACHE_RETENTION:
+            weeks[url] = {
+                "week_start": start.isoformat(),
+                "etag": etag,
+                "last_modified": last_modified,
+                "data": payload,
+            }
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+        return payload
+
+    async def _async_request(
+        self, url: str, headers: dict[str, str], stats: FetchStats
+    ) -> tuple[int, WeekPayload | None, str | None, str | None]:
+        """Request a week, retrying transient failures.
+
+        Returns the status and, on success, the payload with its ETag and
+        Last-Modified headers.
+        """
+        host = urlsplit(url).hostname or ""
+        if (limit := self._host_limits.get(host)) is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+
+        attempt = 0
+        while True:
+            stats.requests += 1
+            started = time.perf_counter()
+            try:
+                async with (
+                    limit,
+                    self._session.get(
+                        url,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                    ) as response,
+                ):
+                    if response.status == 200:
+                        body = await response.read()
+                        decode_started = time.perf_counter()
+                        # Only keep the fields in use, in memory and on disk
+                        payload = project_week(json_loads(body))
+                        stats.latency = decode_started - started
+                        stats.decode_time = time.perf_counter() - decode_started
+                        stats.payload_bytes = len(body)
+                        return (
+                            200,
+                            payload,
+                            response.headers.get(hdrs.ETAG),
+                            response.headers.get(hdrs.LAST_MODIFIED),
+                        )
+                    if (
+                        response.status not in RETRY_STATUSES
+                        or attempt == FETCH_RETRIES
+                    ):
+                        return response.status, None, None, None
+                    _LOGGER.debug("Retrying %s after status %s", url, response.status)
+            except (aiohttp.ClientError, TimeoutError) as err:
+                if attempt == FETCH_RETRIES:
+                    raise
+                _LOGGER.debug("Retrying %s after error: %s", url, err)
+
+            attempt += 1
+            stats.retries += 1
+            await asyncio.sleep(_retry_delay(attempt))
+
+    async def _async_load(self) -> dict[str, dict[str, Any]]:
+        """Load the stored weeks on first use."""
+        async with self._load_lock:
+            if self._weeks is None:
+                stored = await self._store.async_load() or {}
+                self._weeks = stored.get("weeks", {})
+                # Weeks stored before ingest projection still hold raw payloads
+                for week in self._weeks.values():
+                    week["data"] = project_week(week["data"])
+        return self._weeks
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the weeks to store, without the ones that are too old to matter."""
+        assert self._weeks is not None
+        oldest = (dt_util.now().date() - WEEK_CACHE_RETENTION).isoformat()
+        for url in [u for u, w in self._weeks.items() if w["week_start"] < oldest]:
+            del self._weeks[url]
+        return {"weeks": self._weeks}
+
+    def _remember(self, url: str, result: WeekPayload | int) -> None:
+        """Store a result and drop the ones that have expired."""
+        now = time.monotonic()
+        ttl = FETCH_CACHE_TTL.total_seconds()
+        for key in [k for k, (at, _) in self._results.items() if now - at >= ttl]:
+            del self._results[key]
+        self._results[url] = (now, result)
@@ -0,0 +1,197 @@
+"""Bulk import of school menus from a list, a YAML or a CSV file."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+from pathlib import Path
+from typing import Any
+
+import voluptuous as vol
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util.yaml import load_yaml
+
+from .config_flow import CannotConnect, InvalidAuth, fetch_schools
+from .const import (
+    CATEGORIES,
+    CONF_CATEGORIES,
+    CONF_DISTRICT,
+    CONF_MEAL_TYPE,
+    CONF_SCHOOL_NAME,
+    DEFAULT_CATEGORIES,
+    DEFAULT_MEAL_TYPE,
+    DOMAIN,
+    IMPORT_CONCURRENCY,
+    MEAL_TYPES,
+)
+
+
+def _slug(value: Any) -> str:
+    """Return a district, school or meal type as used in URLs."""
+    return cv.string(value).strip().lower()
+
+
+MENU_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_DISTRICT): vol.All(_slug, vol.Length(min=1)),
+        vol.Required(CONF_SCHOOL_NAME): vol.All(_slug, vol.Length(min=1)),
+        vol.Optional(CONF_MEAL_TYPE, default=DEFAULT_MEAL_TYPE): vol.All(
+            _slug, vol.In(MEAL_TYPES)
+        ),
+        vol.Optional(CONF_CATEGORIES, default=DEFAULT_CATEGORIES): vol.All(
+            cv.ensure_list_csv, [vol.All(_slug, vol.In(CATEGORIES))]
+        ),
+    }
+)
+
+
+MENUS_FILE_SUFFIXES = (".yaml", ".yml", ".csv")
+
+
+def read_menus_file(path: Path) -> list[dict[str, Any]]:
+    """Read the menus to import from a YAML list or a CSV file with a header.
+
+    CSV columns are named like the entry data, with categories separated by
+    commas within their cell. Empty cells take the defaults.
+    """
+    try:
+        if path.suffix.lower() == ".csv":
+            with path.open(encoding="utf-8", newline="") as file:
+                return [
+                    {key: value for key, value in row.items() if key and value}
+                    for row in csv.DictReader(file)
+                ]
+        menus = load_yaml(path)
+    except (csv.Error, UnicodeDecodeError) as err:
+        raise HomeAssistantError(f"{path.name} could not be parsed: {err}") from err
+    if not isinstance(menus, list):
+        raise HomeAssistantError(f"{path.name} must contain a list of menus")
+    return menus
+
+
+def _served_menus(schools: list[dict[str, Any]]) -> dict[str, set[str]]:
+    """Return the meal types of each school, all of them when not listed."""
+    return {
+        school["slug"]: {
+            menu_type["slug"]
+            for menu_type in school.get("active_menu_types") or []
+            if isinstance(menu_type, dict) and menu_type.get("slug")
+        }
+        or set(MEAL_TYPES)
+        for school in schools
+    }
+
+
+def _deduplicate(
+    hass: HomeAssistant, menus: list[Any]
+) -> tuple[dict[str, tuple[int, dict[str, Any]]], list[str], list[tuple[int, str]]]:
+    """Return the new menus by unique ID, the skipped and the invalid ones.
+
+    New menus keep their index in the list, invalid ones are an index and an
+    error.
+    """
+    configured = {
+        entry.unique_id for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    new: dict[str, tuple[int, dict[str, Any]]] = {}
+    skipped: list[str] = []
+    invalid: list[tuple[int, str]] = []
+    for index, menu in enumerate(menus):
+        try:
+            data = MENU_SCHEMA(menu)
+        except vol.Invalid as err:
+            invalid.append((index, str(err)))
+            continue
+        unique_id = (
+            f"{data[CONF_DISTRICT]}_{data[CONF_SCHOOL_NAME]}_{data[CONF_MEAL_TYPE]}"
+        )
+        if unique_id in configured or unique_id in new:
+            skipped.append(unique_id)
+        else:
+            new[unique_id] = (index, data)
+    return new, skipped, invalid
+
+
+def _menu_error(
+    data: dict[str, Any], district_menus: dict[str, set[str]] | str
+) -> str | None:
+    """Return why a menu is not served by its district, if it is not."""
+    if isinstance(district_menus, str):
+        return district_menus
+    if (meal_types := district_menus.get(data[CONF_SCHOOL_NAME])) is None:
+        return "Unknown school"
+    if data[CONF_MEAL_TYPE] not in meal_types:
+        return "Meal type not served by the school"
+    return None
+
+
+async def async_import_menus(
+    hass: HomeAssistant, menus: list[Any], *, echo_invalid: bool = True
+) -> dict[str, list[Any]]:
+    """Create an entry for each new menu of a list.
+
+    Menus are deduplicated by the unique ID of their entry, against each other
+    and the configured entries. Each district is then validated once from its
+    school list, IMPORT_CONCURRENCY districts at a time, rather than probing
+    every menu. Valid menus are created through the import step of the
+    config flow.
+
+    Invalid menus are reported by index with their error, and with the menu
+    itself when echo_invalid is set. Menus read from a file are not echoed,
+    whatever file was read.
+    """
+    new, skipped, errors = _deduplicate(hass, menus)
+    semaphore = asyncio.Semaphore(IMPORT_CONCURRENCY)
+
+    async def validate(district: str) -> dict[str, set[str]] | str:
+        """Return the menus served in a district, or why it is invalid."""
+        async with semaphore:
+            try:
+                return _served_menus(await fetch_schools(hass, district))
+            except CannotConnect:
+                return "Could not connect to the district"
+            except InvalidAuth:
+                return "Unknown district"
+
+    districts = list({data[CONF_DISTRICT] for _, data in new.values()})
+    served = dict(
+        zip(
+            districts,
+            await asyncio.gather(*(validate(district) for district in districts)),
+            strict=True,
+        )
+    )
+
+    valid: dict[str, dict[str, Any]] = {}
+    for unique_id, (index, data) in new.items():
+        if (error := _menu_error(data, served[data[CONF_DISTRICT]])) is None:
+            valid[unique_id] = data
+        else:
+            errors.append((index, error))
+
+    results = await asyncio.gather(
+        *(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=data
+            )
+            for data in valid.values()
+        )
+    )
+    created: list[str] = []
+    for unique_id, result in zip(valid, results, strict=True):
+        if result["type"] is FlowResultType.CREATE_ENTRY:
+            created.append(unique_id)
+        else:
+            # Configured meanwhile
+            skipped.append(unique_id)
+
+    invalid = [
+        {"index": index, "error": error}
+        | ({"menu": menus[index]} if echo_invalid else {})
+        for index, error in sorted(errors)
+    ]
+    return {"created": created, "skipped": skipped, "invalid": invalid}
@@ -0,0 +1,145 @@
+"""Calendar platform for nutrislice."""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, datetime, timedelta
+
+import aiohttp
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .api import NutrisliceApiError, NutrisliceUnavailableError
+from .const import (
+    CONF_DISTRICT,
+    CONF_MEAL_TYPE,
+    CONF_SCHOOL_NAME,
+    DOMAIN,
+    MAX_MENU_RANGE,
+)
+from .coordinator import NutrisliceDataUpdateCoordinator
+from .model import DayMenu
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the calendar platform from a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities([NutrisliceCalendar(coordinator, entry)])
+
+
+def _menu_event(day: DayMenu) -> CalendarEvent:
+    """Return the all-day event of a parsed day."""
+    day_date = date.fromisoformat(day.date)
+    return CalendarEvent(
+        start=day_date,
+        end=day_date + timedelta(days=1),
+        summary=day.menu_summary,
+        description="\n".join(
+            f"{item.name} ({item.category or 'other'})" for item in day.items
+        )
+        or None,
+    )
+
+
+def _has_event(day: DayMenu) -> bool:
+    """Return True if the day has a menu or is a holiday."""
+    return day.has_menu or day.is_holiday
+
+
+class NutrisliceCalendar(
+    CoordinatorEntity[NutrisliceDataUpdateCoordinator], CalendarEntity
+):
+    """Representation of a Nutrislice Calendar.
+
+    Each school day of the menu is an all-day event. Range queries are answered
+    from the coordinator's date index, weeks outside the refresh window are
+    fetched lazily and only within a bounded horizon around today.
+    """
+
+    def __init__(
+        self,
+        coordinator: NutrisliceDataUpdateCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the calendar."""
+        super().__init__(coordinator)
+        self.district = entry.data[CONF_DISTRICT]
+        self.school_name = entry.data[CONF_SCHOOL_NAME]
+        self.meal_type = entry.data[CONF_MEAL_TYPE]
+
+        self._attr_name = (
+            f"{self.school_name.replace('-', ' ').title()} {self.meal_type.title()}"
+        )
+        self._attr_unique_id = (
+            f"nutrislice_{self.district}_{self.school_name}_{self.meal_type}"
+        )
+        self._attr_icon = "mdi:food-apple"
+        # The event of the last written state
+        self._written_event: tuple[bool, CalendarEvent | None] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the event of the first state."""
+        await super().async_added_to_hass()
+        # The entity platform writes the first state once the entity is added
+        self._written_event = (self.available, self.event)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the refresh changed the current event."""
+        written_event = (self.available, self.event)
+        if written_event == self._written_event:
+            return
+        self._written_event = written_event
+        self.async_write_ha_state()
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the current or next menu event."""
+        if not self.coordinator.data:
+            return None
+
+        today = dt_util.now().date().isoformat()
+        return next(
+            (
+                _menu_event(day)
+                for day in self.coordinator.data.days_from(today)
+                if _has_event(day)
+            ),
+            None,
+        )
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return the menu events between two datetimes."""
+        today = dt_util.now().date()
+        # Only reach that far from today so a wide query cannot fetch every
+        # week of the school year.
+        start = max(dt_util.as_local(start_date).date(), today - MAX_MENU_RANGE)
+        end = min(dt_util.as_local(end_date).date(), today + MAX_MENU_RANGE)
+        if end < start:
+            return []
+
+        try:
+            days = await self.coordinator.async_get_days(start, end)
+        except (
+            aiohttp.ClientError,
+            TimeoutError,
+            NutrisliceApiError,
+            NutrisliceUnavailableError,
+        ) as err:
+            raise HomeAssistantError(f"Error fetching menu: {err}") from err
+
+        return [_menu_event(day) for day in days if _has_event(day)]
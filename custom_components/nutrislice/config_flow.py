@@ -2,27 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
 import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
 
+from .api import schools_url, week_url
 from .const import (
     CATEGORIES,
     CONF_CATEGORIES,
+    CONF_CATEGORY_COUNT_SENSORS,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_DIAGNOSTIC_SENSORS,
     CONF_DISTRICT,
     CONF_MEAL_TYPE,
     CONF_SCHOOL_NAME,
     DEFAULT_CATEGORIES,
     DEFAULT_MEAL_TYPE,
     DOMAIN,
+    MAX_REQUESTS_PER_HOST,
     MEAL_TYPES,
+    REQUEST_TIMEOUT,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -30,12 +39,23 @@ _LOGGER = logging.getLogger(__name__)
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_DISTRICT): str,
-        vol.Required(CONF_SCHOOL_NAME): str,
+        # Left empty to discover the schools of the district
+        vol.Optional(CONF_SCHOOL_NAME): str,
         vol.Required(CONF_MEAL_TYPE, default=DEFAULT_MEAL_TYPE): vol.In(MEAL_TYPES),
     }
 )
 
 
+def _entry_title(school_name: str, meal_type: str) -> str:
+    """Return the title of the entry of a school menu."""
+    return f"Nutrislice: {school_name.replace('-', ' ').title()} - {meal_type.title()}"
+
+
+def _unique_id(district: str, school_name: str, meal_type: str) -> str:
+    """Return the unique ID of a school menu."""
+    return f"{district}_{school_name}_{meal_type}"
+
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
@@ -45,35 +65,86 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     school_name = data[CONF_SCHOOL_NAME].strip().lower()
     meal_type = data[CONF_MEAL_TYPE].strip().lower()
 
-    # Use a dummy date to validate the API connection
-    url = f"https://{district}.api.nutrislice.com/menu/api/weeks/school/{school_name}/menu-type/{meal_type}/2023/01/01/?format=json"
-
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url, timeout=10) as response:
-                if response.status != 200:
-                    _LOGGER.error(
-                        "Failed to fetch Nutrislice data: %s", response.status
-                    )
-                    raise InvalidAuth(
-                        f"Could not connect to Nutrislice API ({response.status}). Check District/School Name."
-                    )
-                json_data = await response.json()
-                if not json_data.get("days"):
-                    raise InvalidAuth(
-                        "Invalid data received. Check District/School Name."
-                    )
-        except (InvalidAuth, CannotConnect):
-            raise
-        except aiohttp.ClientError as err:
-            raise CannotConnect from err
-        except Exception as err:
-            _LOGGER.exception("Unexpected error during validation")
-            raise CannotConnect from err
+    url = week_url(district, school_name, meal_type, dt_util.now().date())
+    session = async_get_clientsession(hass)
+    try:
+        async with session.get(url, timeout=REQUEST_TIMEOUT) as response:
+            if response.status != 200:
+                _LOGGER.error("Failed to fetch Nutrislice data: %s", response.status)
+                raise InvalidAuth(
+                    f"Could not connect to Nutrislice API ({response.status}). Check District/School Name."
+                )
+            json_data = await response.json()
+            if not json_data.get("days"):
+                raise InvalidAuth("Invalid data received. Check District/School Name.")
+    except (InvalidAuth, CannotConnect):
+        raise
+    except aiohttp.ClientError as err:
+        raise CannotConnect from err
+    except Exception as err:
+        _LOGGER.exception("Unexpected error during validation")
+        raise CannotConnect from err
 
     # Return info that you want to store in the config entry.
+    return {"title": _entry_title(school_name, meal_type)}
+
+
+async def fetch_schools(hass: HomeAssistant, district: str) -> list[dict[str, Any]]:
+    """Return the schools of a district, those with a slug."""
+    session = async_get_clientsession(hass)
+    try:
+        async with session.get(
+            schools_url(district), timeout=REQUEST_TIMEOUT
+        ) as response:
+            if response.status != 200:
+                raise InvalidAuth(f"Could not list the schools ({response.status})")
+            schools = await response.json()
+    except (aiohttp.ClientError, TimeoutError) as err:
+        raise CannotConnect from err
+
+    if not isinstance(schools, list):
+        raise InvalidAuth("Invalid school list received")
+    return [
+        school for school in schools if isinstance(school, dict) and school.get("slug")
+    ]
+
+
+async def discover_menus(hass: HomeAssistant, district: str) -> dict[str, str]:
+    """Return the menus served by the schools of a district.
+
+    Every meal type of every school is probed concurrently, at most
+    MAX_REQUESTS_PER_HOST at a time. Menus are keyed by "school/meal type"
+    with a label to display.
+    """
+    session = async_get_clientsession(hass)
+    names = {
+        school["slug"]: school.get("name") or school["slug"]
+        for school in await fetch_schools(hass, district)
+    }
+
+    semaphore = asyncio.Semaphore(MAX_REQUESTS_PER_HOST)
+    today = dt_util.now().date()
+
+    async def probe(school_name: str, meal_type: str) -> bool:
+        """Return True if the school serves the meal type."""
+        async with semaphore:
+            try:
+                async with session.get(
+                    week_url(district, school_name, meal_type, today),
+                    timeout=REQUEST_TIMEOUT,
+                ) as response:
+                    if response.status != 200:
+                        return False
+                    return bool((await response.json()).get("days"))
+            except (aiohttp.ClientError, TimeoutError, ValueError):
+                return False
+
+    candidates = [(school, meal) for school in names for meal in MEAL_TYPES]
+    served = await asyncio.gather(*(probe(*candidate) for candidate in candidates))
     return {
-        "title": f"Nutrislice: {school_name.replace('-', ' ').title()} - {meal_type.title()}"
+        f"{school}/{meal}": f"{names[school]} - {meal.title()}"
+        for (school, meal), found in zip(candidates, served, strict=True)
+        if found
     }
 
 
@@ -86,13 +157,31 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         """Initialize."""
         self._data: dict[str, Any] = {}
         self._title: str = ""
+        # Menus discovered by district, kept for the life of the flow
+        self._discovered: dict[str, dict[str, str]] = {}
+        # Discovered menus selected by the user, as "school/meal type"
+        self._selected: list[str] = []
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step where user enters district and school."""
         errors: dict[str, str] = {}
-        if user_input is not None:
+        if user_input is not None and not user_input.get(CONF_SCHOOL_NAME, "").strip():
+            district = user_input[CONF_DISTRICT].strip().lower()
+            if (error := await self._async_discover(district)) is None:
+                self._data = {CONF_DISTRICT: district}
+                return await self.async_step_discover()
+            errors["base"] = error
+        elif user_input is not None:
             try:
                 info = await validate_input(self.hass, user_input)
             except CannotConnect:
@@ -116,16 +205,64 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def _async_discover(self, district: str) -> str | None:
+        """Discover the menus of a district once, returning an error if any."""
+        if district not in self._discovered:
+            try:
+                self._discovered[district] = await discover_menus(self.hass, district)
+            except CannotConnect:
+                return "cannot_connect"
+            except InvalidAuth:
+                return "invalid_auth"
+        return None if self._discovered[district] else "no_menus"
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle the selection of discovered menus."""
+        district = self._data[CONF_DISTRICT]
+        configured = self._async_current_ids()
+        menus = {
+            key: label
+            for key, label in self._discovered[district].items()
+            if _unique_id(district, *key.split("/")) not in configured
+        }
+        if not menus:
+            return self.async_abort(reason="already_configured")
+
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            self._selected = [key for key in user_input["menus"] if key in menus]
+            if self._selected:
+                return await self.async_step_categories()
+            errors["base"] = "no_selection"
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {vol.Required("menus", default=list(menus)): cv.multi_select(menus)}
+            ),
+            description_placeholders={"district": district},
+            errors=errors,
+        )
+
     async def async_step_categories(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the category selection step."""
+        if user_input is not None and self._selected:
+            return await self._async_create_selected(user_input[CONF_CATEGORIES])
+
         if user_input is not None:
             self._data[CONF_CATEGORIES] = user_input[CONF_CATEGORIES]
 
             # Add a unique ID to prevent adding the same school/meal twice
             await self.async_set_unique_id(
-                f"{self._data[CONF_DISTRICT]}_{self._data[CONF_SCHOOL_NAME]}_{self._data[CONF_MEAL_TYPE]}"
+                _unique_id(
+                    self._data[CONF_DISTRICT],
+                    self._data[CONF_SCHOOL_NAME],
+                    self._data[CONF_MEAL_TYPE],
+                )
             )
             self._abort_if_unique_id_configured()
 
@@ -155,6 +292,98 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(step_id="categories", data_schema=data_schema)
 
+    async def _async_create_selected(self, categories: list[str]) -> FlowResult:
+        """Create an entry for each selected menu.
+
+        This flow creates the first one, the others are imported.
+        """
+        district = self._data[CONF_DISTRICT]
+        first, *others = (
+            {
+                CONF_DISTRICT: district,
+                CONF_SCHOOL_NAME: school_name,
+                CONF_MEAL_TYPE: meal_type,
+                CONF_CATEGORIES: categories,
+            }
+            for school_name, meal_type in (key.split("/") for key in self._selected)
+        )
+        # Each import sets its entry up, first refresh included: run them
+        # together rather than one after the other.
+        await asyncio.gather(
+            *(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=data
+                )
+                for data in others
+            )
+        )
+
+        await self.async_set_unique_id(
+            _unique_id(district, first[CONF_SCHOOL_NAME], first[CONF_MEAL_TYPE])
+        )
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=_entry_title(first[CONF_SCHOOL_NAME], first[CONF_MEAL_TYPE]),
+            data=first,
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a menu already validated.
+
+        Used by discovery and bulk imports, which validate menus together
+        rather than probing each one here.
+        """
+        await self.async_set_unique_id(
+            _unique_id(
+                import_data[CONF_DISTRICT],
+                import_data[CONF_SCHOOL_NAME],
+                import_data[CONF_MEAL_TYPE],
+            )
+        )
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=_entry_title(
+                import_data[CONF_SCHOOL_NAME], import_data[CONF_MEAL_TYPE]
+            ),
+            data=import_data,
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Nutrislice options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_COMPACT_ATTRIBUTES,
+                    default=self.config_entry.options.get(
+                        CONF_COMPACT_ATTRIBUTES, False
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_CATEGORY_COUNT_SENSORS,
+                    default=self.config_entry.options.get(
+                        CONF_CATEGORY_COUNT_SENSORS, False
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_DIAGNOSTIC_SENSORS,
+                    default=self.config_entry.options.get(
+                        CONF_DIAGNOSTIC_SENSORS, False
+                    ),
+                ): bool,
+            }
+        )
+
+        return self.async_show_form(step_id="init", data_schema=data_schema)
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
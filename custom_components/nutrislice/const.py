@@ -10,13 +10,86 @@ CONF_DISTRICT = "district"
 CONF_SCHOOL_NAME = "school_name"
 CONF_MEAL_TYPE = "meal_type"
 CONF_CATEGORIES = "categories"
+CONF_COMPACT_ATTRIBUTES = "compact_attributes"
+CONF_CATEGORY_COUNT_SENSORS = "category_count_sensors"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
 
 # Default values
 DEFAULT_MEAL_TYPE = "lunch"
 MEAL_TYPES = ["lunch", "breakfast"]
 
-# Update interval
+# Nutrislice API of a district
+API_BASE_URL = "https://{district}.api.nutrislice.com"
+
+# Update interval, adapted to the menu between the min and max intervals
 SCAN_INTERVAL = timedelta(hours=6)
+REFRESH_INTERVAL_MIN = timedelta(hours=2)
+REFRESH_INTERVAL_MAX = timedelta(hours=48)
+
+# Refreshes are spread over slots of this length, so entries do not refresh
+# together. After a restart they are spread over a shorter time.
+REFRESH_SPREAD = timedelta(minutes=30)
+STARTUP_REFRESH_SPREAD = timedelta(minutes=2)
+
+# Hour of the day from which the sensor shows tomorrow's menu
+TARGET_DATE_ROLLOVER_HOUR = 13
+
+# Timeout for a single week request, in seconds
+REQUEST_TIMEOUT = 10
+
+# How long a fetched week is shared between config entries
+FETCH_CACHE_TTL = timedelta(minutes=5)
+
+# Concurrent requests to a single API host
+MAX_REQUESTS_PER_HOST = 4
+
+# Retries of a failed week request, with jittered exponential backoff, in seconds
+FETCH_RETRIES = 2
+FETCH_RETRY_BACKOFF = 1.0
+FETCH_RETRY_BACKOFF_MAX = 10.0
+
+# Consecutive failed requests after which a district API is left alone, and
+# for how long before trying again
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = timedelta(minutes=10)
+
+# Number of weeks outside the refresh window kept in memory per entry
+EXTRA_WEEKS_CACHE_SIZE = 8
+
+# Longest date range that can be queried at once
+MAX_MENU_RANGE = timedelta(weeks=8)
+
+# Longest date range of an export, and weeks fetched ahead while writing it
+MAX_EXPORT_RANGE = timedelta(days=366)
+EXPORT_CONCURRENCY = 4
+# Exports are only written there, under the configuration directory
+EXPORT_DIR = f"{DOMAIN}_exports"
+
+# Districts validated at once by a bulk import
+IMPORT_CONCURRENCY = 8
+
+# Persistent cache of week payloads
+STORAGE_VERSION = 1
+STORAGE_KEY_WEEKS = f"{DOMAIN}.weeks"
+STORAGE_SAVE_DELAY = 30
+WEEK_CACHE_RETENTION = timedelta(weeks=4)
+
+# Archive of past menus, in the config dir
+HISTORY_DB = f"{DOMAIN}_history.db"
+# Days returned by a history query, by default and at most
+HISTORY_LIMIT = 100
+HISTORY_MAX_LIMIT = 1000
+
+# Fired with the changes of a day when a refresh changes the menu
+EVENT_MENU_CHANGED = f"{DOMAIN}_menu_changed"
+
+# Dispatched with the entry id after each refresh, changed or not
+SIGNAL_REFRESHED = f"{DOMAIN}_refreshed_{{}}"
+
+# Keys for integration-wide objects in hass.data[DOMAIN]
+DATA_FETCH_REGISTRY = "fetch_registry"
+DATA_FOOD_CATALOGS = "food_catalogs"
+DATA_HISTORY = "history"
 
 # Categories available in Nutrislice
 CATEGORIES = [
@@ -35,3 +108,8 @@ CATEGORIES = [
 ]
 
 DEFAULT_CATEGORIES = ["entree"]
+
+# Other Nutrislice categories that also count as one of the categories above
+CATEGORY_ALIASES = {
+    "sides": ["vegetable", "fruit", "grain"],
+}
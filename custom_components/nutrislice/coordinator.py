@@ -1,23 +1,89 @@
 """Data update coordinator for Nutrislice."""
 
+import asyncio
+import hashlib
 import logging
-from datetime import datetime, timedelta
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
 
-import aiohttp
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, SCAN_INTERVAL
+from .api import (
+    FetchStats,
+    NutrisliceApiError,
+    NutrisliceUnavailableError,
+    get_fetch_registry,
+    week_start,
+    week_url,
+)
+from .const import (
+    DATA_FOOD_CATALOGS,
+    DOMAIN,
+    EVENT_MENU_CHANGED,
+    EXTRA_WEEKS_CACHE_SIZE,
+    FETCH_CACHE_TTL,
+    REFRESH_INTERVAL_MAX,
+    REFRESH_INTERVAL_MIN,
+    REFRESH_SPREAD,
+    SCAN_INTERVAL,
+    SIGNAL_REFRESHED,
+    STARTUP_REFRESH_SPREAD,
+)
+from .history import get_menu_history
+from .model import WEEK_KEYS, DayMenu, FoodCatalog, NutrisliceMenu, WeekPayload
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class NutrisliceDataUpdateCoordinator(DataUpdateCoordinator):
+def get_food_catalog(hass: HomeAssistant, district: str) -> FoodCatalog:
+    """Return the food catalog shared by the entries of a district."""
+    catalogs = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_FOOD_CATALOGS, {})
+    if district not in catalogs:
+        catalogs[district] = FoodCatalog()
+    return catalogs[district]
+
+
+@dataclass(slots=True)
+class RefreshStats:
+    """Timings of the refreshes of an entry, for diagnostics."""
+
+    last_success: datetime | None = None
+    # Of the last refresh, in seconds
+    refresh_duration: float | None = None
+    parse_duration: float | None = None
+    # Of the last state written by the menu sensor, in seconds and bytes
+    render_duration: float | None = None
+    state_size: int | None = None
+
+
+class NutrisliceDataUpdateCoordinator(DataUpdateCoordinator[NutrisliceMenu]):
     """Class to manage fetching Nutrislice data from their JSON API.
 
     This coordinator handles fetching three weeks of data (previous, current, and next)
     to ensure smooth transitions for the user and to provide enough data for the
-    frontend Lovelace card.
+    frontend Lovelace card. The weeks are parsed once per refresh into a
+    NutrisliceMenu that the entities read from.
+
+    The refresh interval adapts to the menu: it is short while next week is
+    not published or the menu just changed, and backs off while the menu
+    stays the same or the school is on break. Refreshes are then moved to the
+    entry's own offset within a slot of the clock, so entries spread their
+    requests instead of refreshing together.
+
+    When a refresh fails after a menu was loaded, the last good menu is kept
+    and marked stale rather than making the entities unavailable.
+
+    A refresh returning a menu with the same digest keeps the current data and
+    does not notify the entities, so refetching an unchanged menu writes no
+    state. A changed menu fires an event for each day whose displayed menu
+    changed. Past days are written to the history archive, once per version.
     """
 
     def __init__(
@@ -27,55 +93,398 @@ class NutrisliceDataUpdateCoordinator(DataUpdateCoordinator):
         self.district = district
         self.school_name = school_name
         self.meal_type = meal_type
+        self._registry = get_fetch_registry(hass)
+        self._catalog = get_food_catalog(hass, district)
+        self._history = get_menu_history(hass)
+        # Digests of the past days in the archive, by date
+        self._archived: dict[str, str] = {}
+        # Weeks outside the refresh window fetched on demand, with the
+        # monotonic time they expire at
+        self._extra_weeks: OrderedDict[date, tuple[float, NutrisliceMenu]] = (
+            OrderedDict()
+        )
+        # Consecutive refreshes that returned the same menu
+        self._unchanged_refreshes = 0
+        # Whether the last refresh changed the menu, rather than refetched it
+        self.menu_changed = False
+        # When refreshes started failing while the last good menu is served
+        self.stale_since: datetime | None = None
+        self.stats = RefreshStats()
+        # Position of the entry within a refresh slot, the same across restarts
+        self._phase = (
+            int.from_bytes(
+                hashlib.blake2b(
+                    f"{district}/{school_name}/{meal_type}".encode(), digest_size=4
+                ).digest()
+            )
+            / 2**32
+        )
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             update_interval=SCAN_INTERVAL,
+            always_update=False,
         )
 
-    async def _async_update_data(self):
+    async def _fetch_week(
+        self, day: datetime, required: bool = False
+    ) -> WeekPayload | None:
+        """Fetch the week containing the given day.
+
+        Requests go through the shared fetch registry, so entries asking for
+        the same week share a single request. Returns None when the week is
+        not available, unless it is required.
+        """
+        try:
+            return await self._registry.async_get_week(
+                self.district, self.school_name, self.meal_type, day.date()
+            )
+        except NutrisliceApiError as err:
+            if required:
+                raise UpdateFailed(
+                    f"Error fetching current week: {err.status}"
+                ) from err
+            return None
+
+    async def async_restore(self) -> bool:
+        """Restore the last known weeks from storage, without network access.
+
+        Returns True when the current week was found, in which case entities
+        can be created right away and refreshed in the background.
+        """
+        today = dt_util.now()
+        previous, current, upcoming = [
+            await self._registry.async_get_stored_week(
+                self.district, self.school_name, self.meal_type, day.date()
+            )
+            for day in (today - timedelta(days=7), today, today + timedelta(days=7))
+        ]
+        if current is None:
+            return False
+
+        self.async_set_updated_data(
+            NutrisliceMenu.from_weeks(
+                {
+                    "previous_week": previous,
+                    "current_week": current,
+                    "next_week": upcoming,
+                },
+                self._catalog,
+            )
+        )
+        return True
+
+    async def async_get_week_menu(
+        self, start: date, *, remember: bool = True
+    ) -> NutrisliceMenu:
+        """Return the parsed menu of the week starting on the given day.
+
+        Weeks of the refresh window come from the coordinator data. Other
+        weeks are fetched lazily and the most recently used ones are kept
+        until the next refresh would be due, or for FETCH_CACHE_TTL when the
+        week is not published yet, unless remember is False. Raises
+        NutrisliceApiError when the API fails to return the week for another
+        reason.
+        """
+        today = dt_util.now().date()
+        window = {week_start(today + timedelta(days=7 * k)) for k in (-1, 0, 1)}
+        if start in window and self.data is not None:
+            return self.data
+
+        if (cached := self._extra_weeks.get(start)) is not None:
+            expires_at, menu = cached
+            if time.monotonic() < expires_at:
+                self._extra_weeks.move_to_end(start)
+                return menu
+            del self._extra_weeks[start]
+
+        ttl = self.update_interval or SCAN_INTERVAL
+        try:
+            week = await self._registry.async_get_week(
+                self.district,
+                self.school_name,
+                self.meal_type,
+                start,
+                remember=remember,
+            )
+        except NutrisliceApiError as err:
+            if err.status != 404:
+                raise
+            # Not published yet, it may be soon
+            week = None
+            ttl = FETCH_CACHE_TTL
+
+        menu = NutrisliceMenu.from_weeks({"current_week": week}, self._catalog)
+        if not remember:
+            return menu
+        self._extra_weeks[start] = (time.monotonic() + ttl.total_seconds(), menu)
+        while len(self._extra_weeks) > EXTRA_WEEKS_CACHE_SIZE:
+            self._extra_weeks.popitem(last=False)
+        return menu
+
+    async def async_get_days(
+        self, start: date, end: date, *, remember: bool = True
+    ) -> list[DayMenu]:
+        """Return the parsed days between two dates, inclusive.
+
+        Weeks outside the refresh window are not kept when remember is False.
+        """
+        first = week_start(start)
+        week_starts = [
+            first + timedelta(days=7 * k) for k in range((end - first).days // 7 + 1)
+        ]
+        menus = await asyncio.gather(
+            *(self.async_get_week_menu(week, remember=remember) for week in week_starts)
+        )
+
+        days = []
+        for week, menu in zip(week_starts, menus, strict=True):
+            # Window weeks share one menu, only take the days of this week
+            days.extend(
+                menu.days_between(
+                    max(start, week).isoformat(),
+                    min(end, week + timedelta(days=6)).isoformat(),
+                )
+            )
+        return days
+
+    @property
+    def startup_delay(self) -> timedelta:
+        """Return the delay of the first refresh after a restored setup."""
+        return max(STARTUP_REFRESH_SPREAD * self._phase, timedelta(seconds=1))
+
+    def _staggered(self, interval: timedelta) -> timedelta:
+        """Return the interval extended to the entry's next slot.
+
+        Slots are aligned on the clock, so entries refresh at different
+        offsets whenever they were set up.
+        """
+        spread = REFRESH_SPREAD.total_seconds()
+        now = dt_util.now().timestamp()
+        due = now + interval.total_seconds()
+        target = due - due % spread + self._phase * spread
+        if target < due:
+            target += spread
+        return timedelta(seconds=target - now)
+
+    async def _async_update_data(self) -> NutrisliceMenu:
         """Update data via API."""
+        started = time.perf_counter()
         try:
-            # We fetch data for the previous, current, and next week.
-            # Nutrislice API takes any date in the week and returns the whole week.
-            today = datetime.now()
-            prev_week = today - timedelta(days=7)
-            next_week = today + timedelta(days=7)
-
-            data = {}
-
-            async with aiohttp.ClientSession() as session:
-                # Fetch previous week
-                url_prev = f"https://{self.district}.api.nutrislice.com/menu/api/weeks/school/{self.school_name}/menu-type/{self.meal_type}/{prev_week.strftime('%Y/%m/%d')}/?format=json"
-                async with session.get(url_prev, timeout=10) as response:
-                    if response.status == 200:
-                        data["previous_week"] = await response.json()
-                    else:
-                        data["previous_week"] = None
-
-                # Fetch current week
-                url_current = f"https://{self.district}.api.nutrislice.com/menu/api/weeks/school/{self.school_name}/menu-type/{self.meal_type}/{today.strftime('%Y/%m/%d')}/?format=json"
-                async with session.get(url_current, timeout=10) as response:
-                    if response.status != 200:
-                        raise UpdateFailed(
-                            f"Error fetching current week: {response.status}"
-                        )
-                    current_week = await response.json()
-                    data["current_week"] = current_week
-
-                # Fetch next week
-                url_next = f"https://{self.district}.api.nutrislice.com/menu/api/weeks/school/{self.school_name}/menu-type/{self.meal_type}/{next_week.strftime('%Y/%m/%d')}/?format=json"
-                async with session.get(url_next, timeout=10) as response:
-                    if response.status == 200:
-                        next_week_data = await response.json()
-                        data["next_week"] = next_week_data
-                    else:
-                        # Sometimes next week isn't published yet, we just ignore it
-                        data["next_week"] = None
-
-            return data
-
-        except Exception as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
+            return await self._async_refresh_menu()
+        finally:
+            self.stats.refresh_duration = time.perf_counter() - started
+            if self.config_entry is not None:
+                async_dispatcher_send(
+                    self.hass, SIGNAL_REFRESHED.format(self.config_entry.entry_id)
+                )
+
+    async def _async_refresh_menu(self) -> NutrisliceMenu:
+        """Fetch the menu, falling back to the last good one on failures."""
+        try:
+            menu = await self._async_fetch_menu()
+        except UpdateFailed as err:
+            # Retry soon rather than after a long back-off
+            self._unchanged_refreshes = 0
+            self.update_interval = self._staggered(REFRESH_INTERVAL_MIN)
+            if self.data is None:
+                raise
+            # Serve the last good menu, marked stale
+            if self.stale_since is None:
+                _LOGGER.warning(
+                    "Serving the last known menu of %s %s: %s",
+                    self.school_name,
+                    self.meal_type,
+                    err,
+                )
+                self._set_stale(dt_util.utcnow())
+            self.menu_changed = False
+            return self.data
+
+        self.stats.last_success = dt_util.utcnow()
+        if self.stale_since is not None:
+            _LOGGER.info(
+                "Menu of %s %s is fresh again", self.school_name, self.meal_type
+            )
+            self._set_stale(None)
+        self.update_interval = self._staggered(self._next_update_interval(menu))
+        self.menu_changed = self.data is None or menu.digest != self.data.digest
+        if not self.menu_changed:
+            # Same menu: keep the current data so listeners are not notified
+            self._archive_past_days(self.data)
+            return self.data
+        if self.data is not None:
+            self._fire_menu_changed(menu.changes_from(self.data))
+        self._archive_past_days(menu)
+        return menu
+
+    def _archive_past_days(self, menu: NutrisliceMenu) -> None:
+        """Archive the past days of the menu not archived as they are."""
+        if self.config_entry is None:
+            return
+        yesterday = (dt_util.now().date() - timedelta(days=1)).isoformat()
+        past_days = [
+            day
+            for day in menu.days_between("", yesterday)
+            if day.has_menu or day.is_holiday
+        ]
+        self._archived = {
+            date_str: digest
+            for date_str, digest in self._archived.items()
+            if date_str in menu.days
+        }
+        if days := [
+            day for day in past_days if self._archived.get(day.date) != day.digest
+        ]:
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_archive(self.config_entry.entry_id, days),
+                f"{DOMAIN} archive {self.school_name} {self.meal_type}",
+            )
+
+    async def _async_archive(self, entry_id: str, days: list[DayMenu]) -> None:
+        """Write days to the archive."""
+        try:
+            await self._history.async_archive(entry_id, days)
+        except sqlite3.Error as err:
+            _LOGGER.warning(
+                "Could not archive the menu of %s %s: %s",
+                self.school_name,
+                self.meal_type,
+                err,
+            )
+            return
+        self._archived.update((day.date, day.digest) for day in days)
+
+    def _set_stale(self, stale_since: datetime | None) -> None:
+        """Mark the menu stale or fresh and let the entities show it."""
+        self.stale_since = stale_since
+        # The data itself may not change, which would not notify the listeners
+        self.async_update_listeners()
+
+    @property
+    def stale(self) -> bool:
+        """Return True while the last good menu is served after failures."""
+        return self.stale_since is not None
+
+    def _fire_menu_changed(self, changes: list[dict[str, Any]]) -> None:
+        """Fire an event for each changed day."""
+        for day_changes in changes:
+            self.hass.bus.async_fire(
+                EVENT_MENU_CHANGED,
+                {
+                    "entry_id": self.config_entry.entry_id
+                    if self.config_entry
+                    else None,
+                    "district": self.district,
+                    "school_name": self.school_name,
+                    "meal_type": self.meal_type,
+                    **day_changes,
+                },
+            )
+
+    def _next_update_interval(self, menu: NutrisliceMenu) -> timedelta:
+        """Return the interval until the next refresh, learned from the menu."""
+        changed = self.data is not None and menu.digest != self.data.digest
+        if self.data is None or changed:
+            self._unchanged_refreshes = 0
+        else:
+            self._unchanged_refreshes += 1
+
+        now = dt_util.now()
+        if not any(day.has_menu for day in menu.days_from(now.date().isoformat())):
+            # On break: nothing left to serve in the window
+            interval = REFRESH_INTERVAL_MAX
+        elif menu.weeks.get("next_week") is None or changed:
+            # Next week is not published yet, or the menu just changed
+            interval = REFRESH_INTERVAL_MIN
+        else:
+            # Back off while the menu stays the same
+            interval = min(
+                SCAN_INTERVAL * 2 ** max(self._unchanged_refreshes - 1, 0),
+                REFRESH_INTERVAL_MAX,
+            )
+
+        # Always refresh when a new week starts, as the window moves with it
+        next_week = dt_util.start_of_local_day(
+            week_start(now.date()) + timedelta(days=7)
+        )
+        interval = min(interval, next_week - now + timedelta(minutes=5))
+
+        _LOGGER.debug(
+            "Next refresh of %s %s in %s", self.school_name, self.meal_type, interval
+        )
+        return interval
+
+    async def _async_fetch_menu(self) -> NutrisliceMenu:
+        """Fetch and parse the weeks of the refresh window."""
+        # We fetch data for the previous, current, and next week.
+        # Nutrislice API takes any date in the week and returns the whole week.
+        today = dt_util.now()
+        prev_week = today - timedelta(days=7)
+        next_week = today + timedelta(days=7)
+
+        # The three weeks are requested concurrently, so a refresh costs at
+        # most one request timeout instead of three.
+        previous, current, upcoming = await asyncio.gather(
+            self._fetch_week(prev_week),
+            self._fetch_week(today, required=True),
+            self._fetch_week(next_week),
+            return_exceptions=True,
+        )
+
+        if isinstance(current, UpdateFailed):
+            raise current
+        if isinstance(current, NutrisliceUnavailableError):
+            raise UpdateFailed(str(current)) from current
+        if isinstance(current, BaseException):
+            raise UpdateFailed(f"Error communicating with API: {current}") from current
+
+        data: dict[str, WeekPayload | None] = {"current_week": current}
+        # Previous and next week are optional: sometimes next week isn't
+        # published yet, we just ignore it.
+        for key, result in (("previous_week", previous), ("next_week", upcoming)):
+            if isinstance(result, BaseException):
+                _LOGGER.debug("Ignoring error fetching %s: %s", key, result)
+                result = None
+            data[key] = result
+
+        started = time.perf_counter()
+        menu = NutrisliceMenu.from_weeks(data, self._catalog)
+        self.stats.parse_duration = time.perf_counter() - started
+        return menu
+
+    def window_fetch_stats(self) -> dict[str, FetchStats]:
+        """Return the request stats of the weeks of the refresh window."""
+        today = dt_util.now().date()
+        starts = [week_start(today + timedelta(days=7 * k)) for k in (-1, 0, 1)]
+        return {
+            key: self._registry.get_stats(
+                week_url(self.district, self.school_name, self.meal_type, start),
+                start,
+            )
+            for key, start in zip(WEEK_KEYS, starts, strict=True)
+        }
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return what the entry costs, for diagnostics."""
+        last_success = self.stats.last_success
+        return {
+            **asdict(self.stats),
+            "seconds_since_success": (
+                (dt_util.utcnow() - last_success).total_seconds()
+                if last_success
+                else None
+            ),
+            "stale_since": self.stale_since,
+            "update_interval": self.update_interval,
+            "breaker_open": self._registry.get_breaker(self.district).is_open,
+            "weeks": {
+                key: stats.as_dict() for key, stats in self.window_fetch_stats().items()
+            },
+            "days": len(self.data.days) if self.data else 0,
+            "extra_weeks": len(self._extra_weeks),
+            "district_foods": len(self._catalog),
+        }
@@ -0,0 +1,37 @@
+"""Diagnostics support for Nutrislice."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import CONF_DISTRICT, CONF_MEAL_TYPE, CONF_SCHOOL_NAME, DOMAIN
+from .coordinator import NutrisliceDataUpdateCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: NutrisliceDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    diagnostics = coordinator.diagnostics()
+
+    # The menu sensor only measures its state for the diagnostic sensors,
+    # measure it here for the others.
+    entity_id = er.async_get(hass).async_get_entity_id(
+        SENSOR_DOMAIN,
+        DOMAIN,
+        f"nutrislice_{entry.data[CONF_DISTRICT]}_{entry.data[CONF_SCHOOL_NAME]}"
+        f"_{entry.data[CONF_MEAL_TYPE]}",
+    )
+    if entity_id and (state := hass.states.get(entity_id)) is not None:
+        diagnostics["state_size"] = len(state.as_dict_json)
+
+    return {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "coordinator": diagnostics,
+    }
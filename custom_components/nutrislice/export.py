@@ -0,0 +1,162 @@
+"""Streaming export of menus to JSONL or CSV files."""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import os
+from collections import deque
+from collections.abc import Iterator, Sequence
+from datetime import date, timedelta
+from pathlib import Path
+from typing import IO, Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_dumps
+
+from .api import week_start
+from .const import EXPORT_CONCURRENCY
+from .coordinator import NutrisliceDataUpdateCoordinator
+from .model import DayMenu
+
+EXPORT_FORMATS = ("jsonl", "csv")
+
+CSV_FIELDS = (
+    "entry_id",
+    "district",
+    "school_name",
+    "meal_type",
+    "date",
+    "is_holiday",
+    "holiday_name",
+    "position",
+    "name",
+    "category",
+)
+
+
+def _weeks(
+    coordinators: Sequence[NutrisliceDataUpdateCoordinator], start: date, end: date
+) -> Iterator[tuple[NutrisliceDataUpdateCoordinator, date, date]]:
+    """Return the weeks to export in file order, clipped to the range."""
+    for coordinator in coordinators:
+        week = week_start(start)
+        while week <= end:
+            yield coordinator, max(start, week), min(end, week + timedelta(days=6))
+            week += timedelta(days=7)
+
+
+def _entry_fields(coordinator: NutrisliceDataUpdateCoordinator) -> dict[str, Any]:
+    """Return the fields identifying the entry of a day."""
+    return {
+        "entry_id": coordinator.config_entry.entry_id
+        if coordinator.config_entry
+        else None,
+        "district": coordinator.district,
+        "school_name": coordinator.school_name,
+        "meal_type": coordinator.meal_type,
+    }
+
+
+def _write_days(
+    file: IO[str], fmt: str, entry: dict[str, Any], days: list[DayMenu]
+) -> int:
+    """Write days to the file, returning the number of records."""
+    if fmt == "jsonl":
+        file.writelines(f"{json_dumps({**entry, **day.as_dict()})}\n" for day in days)
+        return len(days)
+
+    writer = csv.writer(file)
+    records = 0
+    for day in days:
+        if not (day.has_menu or day.is_holiday):
+            continue
+        day_fields = [*entry.values(), day.date, day.is_holiday, day.holiday_name]
+        # A holiday without items still gets its row
+        items = day.items or (None,)
+        writer.writerows(
+            [
+                *day_fields,
+                position if item else None,
+                item.name if item else None,
+                (item.category or "other") if item else None,
+            ]
+            for position, item in enumerate(items)
+        )
+        records += len(items)
+    return records
+
+
+def _open(path: Path, fmt: str) -> IO[str]:
+    """Open a temporary file next to the export, with the CSV header."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file = path.with_name(f".{path.name}.tmp").open("w", encoding="utf-8", newline="")
+    if fmt == "csv":
+        csv.writer(file).writerow(CSV_FIELDS)
+    return file
+
+
+def _close(file: IO[str], path: Path, complete: bool) -> None:
+    """Close the temporary file and move it in place when complete."""
+    file.close()
+    if complete:
+        os.replace(file.name, path)
+    else:
+        os.unlink(file.name)
+
+
+async def async_export_menus(
+    hass: HomeAssistant,
+    coordinators: Sequence[NutrisliceDataUpdateCoordinator],
+    start: date,
+    end: date,
+    path: Path,
+    fmt: str,
+) -> dict[str, Any]:
+    """Export the days of entries between two dates, inclusive.
+
+    Days are written entry by entry in date order, one week at a time. Weeks
+    come from the coordinators, which fetch the weeks outside their window
+    without keeping them. At most EXPORT_CONCURRENCY weeks are fetched ahead
+    of the one being written, so only those are held in memory whatever the
+    range. The file only replaces an existing one once it is complete, and
+    the export fails if a week cannot be fetched.
+    """
+    weeks = _weeks(coordinators, start, end)
+    pending: deque[tuple[dict[str, Any], asyncio.Task[list[DayMenu]]]] = deque()
+
+    def fetch_ahead() -> None:
+        while (
+            len(pending) < EXPORT_CONCURRENCY
+            and (week := next(weeks, None)) is not None
+        ):
+            coordinator, first, last = week
+            pending.append(
+                (
+                    _entry_fields(coordinator),
+                    hass.async_create_task(
+                        coordinator.async_get_days(first, last, remember=False)
+                    ),
+                )
+            )
+
+    file = await hass.async_add_executor_job(_open, path, fmt)
+    records = 0
+    complete = False
+    try:
+        fetch_ahead()
+        while pending:
+            entry, task = pending.popleft()
+            days = await task
+            fetch_ahead()
+            records += await hass.async_add_executor_job(
+                _write_days, file, fmt, entry, days
+            )
+        complete = True
+    finally:
+        for _, task in pending:
+            task.cancel()
+        await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+        await hass.async_add_executor_job(_close, file, path, complete)
+
+    return {"path": str(path), "records": records}
@@ -0,0 +1,238 @@
+"""Archive of past menus in SQLite, for history queries."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Iterable
+from contextlib import closing
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_HISTORY, DOMAIN, HISTORY_DB, HISTORY_LIMIT
+from .model import DayMenu
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    entry_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    is_holiday INTEGER NOT NULL,
+    holiday_name TEXT,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (entry_id, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS items (
+    entry_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    food_id INTEGER,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    PRIMARY KEY (entry_id, date, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS days_date ON days (date);
+CREATE INDEX IF NOT EXISTS items_date ON items (date);
+CREATE INDEX IF NOT EXISTS items_food ON items (name COLLATE NOCASE, food_id);
+CREATE INDEX IF NOT EXISTS items_category ON items (category);
+"""
+
+
+def get_menu_history(hass: HomeAssistant) -> MenuHistory:
+    """Return the menu history shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_HISTORY not in domain_data:
+        domain_data[DATA_HISTORY] = MenuHistory(hass, hass.config.path(HISTORY_DB))
+    return domain_data[DATA_HISTORY]
+
+
+class MenuHistory:
+    """Past days of every entry, kept once they leave the refresh window.
+
+    Rows hold the displayed items of a day, one per food, so a semester of a
+    school takes a few hundred kilobytes and queries by date, food or
+    category use an index. The database is only touched from the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str) -> None:
+        """Initialize the archive, created on first use."""
+        self.hass = hass
+        self.path = path
+        self._created = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating its tables on first use."""
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+        if not self._created:
+            connection.executescript(SCHEMA)
+            self._created = True
+        return connection
+
+    async def async_archive(self, entry_id: str, days: Iterable[DayMenu]) -> None:
+        """Archive days of an entry, replacing their previous versions."""
+        await self.hass.async_add_executor_job(self._archive, entry_id, list(days))
+
+    def _archive(self, entry_id: str, days: list[DayMenu]) -> None:
+        """Archive days of an entry."""
+        with closing(self._connect()) as connection, connection:
+            for day in days:
+                (stored,) = connection.execute(
+                    "SELECT count(*) FROM days WHERE entry_id = ? AND date = ?"
+                    " AND digest = ?",
+                    (entry_id, day.date, day.digest),
+                ).fetchone()
+                if stored:
+                    continue
+                connection.execute(
+                    "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?, ?)",
+                    (entry_id, day.date, day.is_holiday, day.holiday_name, day.digest),
+                )
+                connection.execute(
+                    "DELETE FROM items WHERE entry_id = ? AND date = ?",
+                    (entry_id, day.date),
+                )
+                connection.executemany(
+                    "INSERT INTO items VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            entry_id,
+                            day.date,
+                            position,
+                            item.food_id,
+                            item.name,
+                            item.category,
+                        )
+                        for position, item in enumerate(day.items)
+                    ),
+                )
+
+    async def async_remove_entry(self, entry_id: str) -> None:
+        """Remove the days of an entry."""
+        await self.hass.async_add_executor_job(self._remove_entry, entry_id)
+
+    def _remove_entry(self, entry_id: str) -> None:
+        """Remove the days of an entry."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM days WHERE entry_id = ?", (entry_id,))
+            connection.execute("DELETE FROM items WHERE entry_id = ?", (entry_id,))
+
+    async def async_query(
+        self,
+        entry_id: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+        food: str | None = None,
+        category: str | None = None,
+        limit: int = HISTORY_LIMIT,
+    ) -> dict[str, Any]:
+        """Return the archived days and how often each food was served.
+
+        Dates are ISO dates, inclusive. Food matches names starting with it,
+        ignoring case, so the lookup uses the index on names. Days only list
+        the items matching the filters, and days without any are left out
+        when filtering on food or category. Only the first days up to limit
+        are returned, the next ones are queried from the day after the last.
+        """
+        return await self.hass.async_add_executor_job(
+            self._query, entry_id, start, end, food, category, limit
+        )
+
+    def _query(
+        self,
+        entry_id: str | None,
+        start: str | None,
+        end: str | None,
+        food: str | None,
+        category: str | None,
+        limit: int,
+    ) -> dict[str, Any]:
+        """Return the archived days and how often each food was served."""
+        day_where, day_params = _where(entry_id, start, end)
+        item_where, item_params = _where(entry_id, start, end, food, category)
+        if food or category:
+            # Only the days serving a matching item count towards the limit
+            day_where = (
+                f"{day_where} {'AND' if day_where else 'WHERE'} EXISTS (SELECT 1"
+                f" FROM items {item_where} AND items.entry_id = days.entry_id"
+                " AND items.date = days.date)"
+            )
+            day_params += item_params
+
+        with closing(self._connect()) as connection:
+            days = [
+                {
+                    "entry_id": row["entry_id"],
+                    "date": row["date"],
+                    "is_holiday": bool(row["is_holiday"]),
+                    "holiday_name": row["holiday_name"],
+                    "menu_items": [],
+                }
+                for row in connection.execute(
+                    "SELECT entry_id, date, is_holiday, holiday_name"
+                    f" FROM days {day_where} ORDER BY date, entry_id LIMIT ?",
+                    [*day_params, limit],
+                )
+            ]
+
+            # Items of the returned days only
+            if days:
+                items = {
+                    (day["entry_id"], day["date"]): day["menu_items"] for day in days
+                }
+                for row in connection.execute(
+                    "SELECT entry_id, date, name, category FROM items"
+                    f" {item_where} {'AND' if item_where else 'WHERE'}"
+                    " date BETWEEN ? AND ? ORDER BY date, entry_id, position",
+                    [*item_params, days[0]["date"], days[-1]["date"]],
+                ):
+                    if (
+                        menu_items := items.get((row["entry_id"], row["date"]))
+                    ) is not None:
+                        menu_items.append(
+                            {
+                                "name": row["name"],
+                                "category": row["category"] or "other",
+                            }
+                        )
+
+            foods = [
+                dict(row)
+                for row in connection.execute(
+                    "SELECT name, category, count(*) AS count,"
+                    " min(date) AS first_served, max(date) AS last_served"
+                    f" FROM items {item_where}"
+                    " GROUP BY name COLLATE NOCASE, category"
+                    " ORDER BY count DESC, name",
+                    item_params,
+                )
+            ]
+
+        return {"days": days, "foods": foods}
+
+
+def _where(
+    entry_id: str | None,
+    start: str | None,
+    end: str | None,
+    food: str | None = None,
+    category: str | None = None,
+) -> tuple[str, list[Any]]:
+    """Return the WHERE clause of the filters and its parameters."""
+    clauses = []
+    params: list[Any] = []
+    for clause, value in (
+        ("entry_id = ?", entry_id),
+        ("date >= ?", start),
+        ("date <= ?", end),
+        ("name LIKE ? ESCAPE '\\'", f"{_escape_like(food)}%" if food else None),
+        ("category = ?", category.lower() if category else None),
+    ):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def _escape_like(value: str) -> str:
+    """Return text matched literally by a LIKE pattern escaped with a backslash."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
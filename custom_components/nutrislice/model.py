@@ -0,0 +1,432 @@
+"""Parsed menu model for Nutrislice."""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, NotRequired, TypedDict
+from weakref import WeakValueDictionary
+
+from .const import CATEGORIES, CATEGORY_ALIASES
+
+WEEK_KEYS = ("previous_week", "current_week", "next_week")
+
+
+def _digest(*parts: object) -> str:
+    """Return a short stable hash of the given parts."""
+    return hashlib.blake2b(
+        "\x1f".join(map(str, parts)).encode(), digest_size=8
+    ).hexdigest()
+
+
+class FoodPayload(TypedDict):
+    """The fields of a Nutrislice food that are kept."""
+
+    id: NotRequired[int]
+    name: NotRequired[str]
+    food_category: NotRequired[str]
+
+
+class MenuItemPayload(TypedDict):
+    """The fields of a Nutrislice menu item that are kept."""
+
+    is_holiday: NotRequired[bool]
+    text: NotRequired[str]
+    category: NotRequired[str]
+    food: NotRequired[FoodPayload]
+
+
+class DayPayload(TypedDict):
+    """A day of a projected week."""
+
+    date: str
+    menu_items: list[MenuItemPayload]
+
+
+class WeekPayload(TypedDict):
+    """A week as kept after ingest."""
+
+    days: list[DayPayload]
+
+
+def _project_item(item: dict[str, Any]) -> MenuItemPayload | None:
+    """Project a menu item, or return None if nothing of it is used."""
+    if item.get("is_holiday"):
+        holiday: MenuItemPayload = {"is_holiday": True}
+        if "text" in item:
+            holiday["text"] = item["text"]
+        return holiday
+
+    if not (food := item.get("food")):
+        # Section headers and notes
+        return None
+
+    projected_food: FoodPayload = {}
+    if "id" in food:
+        projected_food["id"] = food["id"]
+    if "name" in food:
+        projected_food["name"] = food["name"]
+    if "food_category" in food:
+        projected_food["food_category"] = food["food_category"]
+
+    projected: MenuItemPayload = {"food": projected_food}
+    if item.get("category"):
+        projected["category"] = item["category"]
+    return projected
+
+
+def project_week(week: dict[str, Any]) -> WeekPayload:
+    """Project a raw week from the API down to the fields in use.
+
+    Raw weeks carry full food objects (nutrition, images, descriptions, icons,
+    serving sizes) that are never displayed. Only the date, holiday text and
+    item name, category and ids are kept, which is also valid input for the
+    parsing below.
+    """
+    return {
+        "days": [
+            {
+                "date": day["date"],
+                "menu_items": [
+                    projected
+                    for item in day.get("menu_items") or []
+                    if (projected := _project_item(item)) is not None
+                ],
+            }
+            for day in week.get("days") or []
+            if day.get("date")
+        ]
+    }
+
+
+class CategoryClassifier:
+    """Map the categories Nutrislice gives to items to the known categories.
+
+    A raw category matches a category when either is a prefix of the other
+    ("entrees" is an "entree"), or of one of its aliases. The rules are built
+    once and every raw category string is only matched the first time it is
+    seen.
+    """
+
+    def __init__(
+        self,
+        categories: Iterable[str] = CATEGORIES,
+        aliases: Mapping[str, Iterable[str]] = CATEGORY_ALIASES,
+    ) -> None:
+        """Initialize the classifier from the categories and their aliases."""
+        self._rules = tuple(
+            (category, (category, *aliases.get(category, ())))
+            for category in categories
+        )
+        self._cache: dict[str, frozenset[str]] = {}
+
+    def classify(self, raw_category: str) -> frozenset[str]:
+        """Return the categories a raw category belongs to."""
+        if (found := self._cache.get(raw_category)) is None:
+            found = self._cache[raw_category] = self._match(raw_category.lower())
+        return found
+
+    def _match(self, raw_category: str) -> frozenset[str]:
+        """Match a lowercased raw category against the rules."""
+        if not raw_category:
+            return frozenset()
+        return frozenset(
+            category
+            for category, names in self._rules
+            if any(
+                raw_category.startswith(name) or name.startswith(raw_category)
+                for name in names
+            )
+        )
+
+
+DEFAULT_CLASSIFIER = CategoryClassifier()
+
+
+@dataclass(frozen=True, slots=True, weakref_slot=True)
+class MenuItem:
+    """A food served on a menu.
+
+    Items are shared through the district's FoodCatalog and must not be
+    created directly by the entities.
+    """
+
+    food_id: int | None
+    name: str
+    # Lowercased category of the item, empty when unknown
+    category: str
+    # Known categories the item belongs to
+    categories: frozenset[str] = frozenset()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the item as exposed to the frontend."""
+        return {"name": self.name, "category": self.category or "other"}
+
+
+class FoodCatalog:
+    """Menu items shared by every entry of a district.
+
+    Schools of a district serve largely the same foods, so items are
+    deduplicated by Nutrislice food id (and name and category, which can vary
+    between menus) and their strings are interned. Parsed menus then hold one
+    item per food, however many entries and days serve it. Items are held
+    weakly and dropped once no menu references them anymore.
+
+    This only covers the parsed layer. The fetch registry keeps the projected
+    payload of every stored week, which still grows with entries x weeks x
+    items and outweighs the parsed menus several times over.
+    """
+
+    def __init__(self, classifier: CategoryClassifier = DEFAULT_CLASSIFIER) -> None:
+        """Initialize the catalog."""
+        self._classifier = classifier
+        self._items: WeakValueDictionary[tuple[int | None, str, str], MenuItem] = (
+            WeakValueDictionary()
+        )
+
+    def __len__(self) -> int:
+        """Return the number of foods in the catalog."""
+        return len(self._items)
+
+    def get_item(self, food_id: int | None, name: str, category: str) -> MenuItem:
+        """Return the shared item for a food."""
+        key = (food_id, sys.intern(name), sys.intern(category))
+        if (item := self._items.get(key)) is None:
+            item = self._items[key] = MenuItem(
+                *key, categories=self._classifier.classify(category)
+            )
+        return item
+
+
+@dataclass(frozen=True, slots=True)
+class DayMenu:
+    """A parsed day of the menu."""
+
+    date: str
+    # Items displayed for the day
+    items: tuple[MenuItem, ...] = ()
+    is_holiday: bool = False
+    holiday_name: str | None = None
+    # Every food of the day by category, for the categories it matches
+    category_items: Mapping[str, tuple[MenuItem, ...]] = field(default_factory=dict)
+    # Only the displayed items, by category
+    displayed_category_items: Mapping[str, tuple[MenuItem, ...]] = field(
+        default_factory=dict
+    )
+    # Hash of the content of the day, equal digests render the same
+    digest: str = field(default="", compare=False)
+
+    @classmethod
+    def from_payload(cls, day: Mapping[str, Any], catalog: FoodCatalog) -> DayMenu:
+        """Parse a day of a week payload."""
+        items: list[MenuItem] = []
+        is_holiday = False
+        holiday_name = None
+        category_items: dict[str, list[MenuItem]] = {}
+        displayed_category_items: dict[str, list[MenuItem]] = {}
+        content: list[object] = []
+
+        for item in day.get("menu_items", []):
+            if item.get("is_holiday"):
+                if not is_holiday:
+                    is_holiday = True
+                    holiday_name = item.get("text", "Holiday")
+                continue
+
+            if not (food := item.get("food")):
+                continue
+
+            category = (item.get("category") or food.get("food_category") or "").lower()
+            menu_item = catalog.get_item(
+                food.get("id"), (food.get("name") or "").strip(), category
+            )
+
+            # Items after a holiday are not displayed
+            displayed = (
+                not is_holiday
+                and menu_item.name
+                and menu_item.name != "Menu Subject to Change"
+            )
+            if displayed:
+                items.append(menu_item)
+            content.extend((menu_item.food_id, menu_item.name, category, displayed))
+
+            for known in menu_item.categories:
+                category_items.setdefault(known, []).append(menu_item)
+                if displayed:
+                    displayed_category_items.setdefault(known, []).append(menu_item)
+
+        return cls(
+            date=day["date"],
+            items=tuple(items),
+            is_holiday=is_holiday,
+            holiday_name=holiday_name,
+            category_items={cat: tuple(found) for cat, found in category_items.items()},
+            displayed_category_items={
+                cat: tuple(found) for cat, found in displayed_category_items.items()
+            },
+            digest=_digest(day["date"], is_holiday, holiday_name, *content),
+        )
+
+    @property
+    def has_menu(self) -> bool:
+        """Return True if the day has items to display."""
+        return bool(self.items)
+
+    @property
+    def menu_summary(self) -> str:
+        """Return the menu of the day as a single line."""
+        if self.is_holiday:
+            return self.holiday_name
+        if self.items:
+            return ", ".join(item.name for item in self.items)
+        return "No menu"
+
+    def get_items(self, category: str) -> tuple[MenuItem, ...]:
+        """Return the items matching a category."""
+        return self.category_items.get(category, ())
+
+    def get_displayed_items(self, category: str) -> tuple[MenuItem, ...]:
+        """Return the displayed items matching a category."""
+        return self.displayed_category_items.get(category, ())
+
+    def changes_from(self, previous: DayMenu) -> dict[str, Any] | None:
+        """Return the displayed changes since a previous version of the day.
+
+        Returns None when nothing displayed changed.
+        """
+        names = {item.name: None for item in self.items}
+        previous_names = {item.name: None for item in previous.items}
+        added = [name for name in names if name not in previous_names]
+        removed = [name for name in previous_names if name not in names]
+        holiday_changed = (self.is_holiday, self.holiday_name) != (
+            previous.is_holiday,
+            previous.holiday_name,
+        )
+        if not (added or removed or holiday_changed):
+            return None
+        return {
+            "date": self.date,
+            "added": added,
+            "removed": removed,
+            "holiday_changed": holiday_changed,
+            "is_holiday": self.is_holiday,
+            "holiday_name": self.holiday_name,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the day as exposed to the frontend."""
+        return {
+            "date": self.date,
+            "is_holiday": self.is_holiday,
+            "holiday_name": self.holiday_name,
+            "menu_items": [item.as_dict() for item in self.items],
+            "has_menu": self.has_menu,
+            "menu_summary": self.menu_summary,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class WeekMenu:
+    """A parsed week of the menu."""
+
+    days: tuple[DayMenu, ...]
+    # Hash of the digests of the days
+    digest: str = field(default="", compare=False)
+
+    @classmethod
+    def from_payload(cls, week: WeekPayload, catalog: FoodCatalog) -> WeekMenu:
+        """Parse a week payload."""
+        days = tuple(
+            DayMenu.from_payload(day, catalog)
+            for day in week.get("days", [])
+            if day.get("date")
+        )
+        return cls(days=days, digest=_digest(*(day.digest for day in days)))
+
+
+@dataclass(frozen=True, slots=True)
+class NutrisliceMenu:
+    """The menu of a refresh, parsed once and indexed by date.
+
+    Built by the coordinator after each refresh so entities can look days up
+    without merging and parsing the weeks again.
+    """
+
+    weeks: Mapping[str, WeekMenu | None]
+    days: Mapping[str, DayMenu] = field(default_factory=dict)
+    # Sorted dates of `days`, for range lookups
+    dates: tuple[str, ...] = ()
+    # Hash of the digests of the weeks, tells a changed menu from a refetch
+    digest: str = field(default="", compare=False)
+
+    @classmethod
+    def from_weeks(
+        cls,
+        weeks: Mapping[str, WeekPayload | None],
+        catalog: FoodCatalog | None = None,
+    ) -> NutrisliceMenu:
+        """Build the menu from the previous, current and next week payloads."""
+        if catalog is None:
+            catalog = FoodCatalog()
+        parsed = {
+            key: None if week is None else WeekMenu.from_payload(week, catalog)
+            for key, week in weeks.items()
+        }
+
+        # Deduplicate by date, earlier weeks win, and sort
+        days: dict[str, DayMenu] = {}
+        for key in WEEK_KEYS:
+            if week_menu := parsed.get(key):
+                for day in week_menu.days:
+                    days.setdefault(day.date, day)
+        days = {date_str: days[date_str] for date_str in sorted(days)}
+
+        return cls(
+            weeks=MappingProxyType(parsed),
+            days=MappingProxyType(days),
+            dates=tuple(days),
+            digest=_digest(
+                *(
+                    f"{key}:{week.digest if (week := parsed[key]) else '-'}"
+                    for key in sorted(parsed)
+                )
+            ),
+        )
+
+    def parsed_days(self) -> list[dict[str, Any]]:
+        """Return every day as exposed to the frontend."""
+        return [day.as_dict() for day in self.days.values()]
+
+    def get_day(self, date_str: str) -> DayMenu | None:
+        """Return the parsed day for a date, if it is in the menu."""
+        return self.days.get(date_str)
+
+    def changes_from(self, previous: NutrisliceMenu) -> list[dict[str, Any]]:
+        """Return the changes of the days found in both menus.
+
+        Only days whose digests differ are compared item by item.
+        """
+        changes = []
+        for date_str, day in self.days.items():
+            before = previous.days.get(date_str)
+            if before is None or before.digest == day.digest:
+                continue
+            if (day_changes := day.changes_from(before)) is not None:
+                changes.append(day_changes)
+        return changes
+
+    def days_between(self, start: str, end: str) -> list[DayMenu]:
+        """Return the parsed days between two ISO dates, inclusive."""
+        first = bisect_left(self.dates, start)
+        last = bisect_right(self.dates, end)
+        return [self.days[date_str] for date_str in self.dates[first:last]]
+
+    def days_from(self, start: str) -> list[DayMenu]:
+        """Return the parsed days from an ISO date on."""
+        first = bisect_left(self.dates, start)
+        return [self.days[date_str] for date_str in self.dates[first:]]
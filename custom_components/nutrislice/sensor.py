@@ -3,30 +3,66 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from enum import IntFlag
+from time import perf_counter
 from typing import Any
 
 import voluptuous as vol
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    MAX_LENGTH_STATE_STATE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
 from homeassistant.helpers import entity_platform
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_point_in_time
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
     CONF_CATEGORIES,
+    CONF_CATEGORY_COUNT_SENSORS,
+    CONF_COMPACT_ATTRIBUTES,
+    CONF_DIAGNOSTIC_SENSORS,
     CONF_DISTRICT,
     CONF_MEAL_TYPE,
     CONF_SCHOOL_NAME,
     DEFAULT_CATEGORIES,
     DOMAIN,
+    SIGNAL_REFRESHED,
+    TARGET_DATE_ROLLOVER_HOUR,
 )
 from .coordinator import NutrisliceDataUpdateCoordinator
+from .model import DayMenu
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class NutrisliceSensorFeature(IntFlag):
+    """Features of the sensors, so entity services skip the ones without a menu."""
+
+    MENU = 1
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -35,14 +71,19 @@ async def async_setup_entry(
     """Set up the sensor platform from a config entry."""
     coordinator = hass.data[DOMAIN][entry.entry_id]
 
-    async_add_entities(
-        [
-            NutrisliceSensor(
-                coordinator,
-                entry,
-            )
-        ]
-    )
+    # Every sensor reads the same parsed menu of the coordinator, so more
+    # categories cost no request nor parsing.
+    entities: list[SensorEntity] = [NutrisliceSensor(coordinator, entry)]
+    for category in entry.data.get(CONF_CATEGORIES, DEFAULT_CATEGORIES):
+        entities.append(NutrisliceCategorySensor(coordinator, entry, category))
+        if entry.options.get(CONF_CATEGORY_COUNT_SENSORS, False):
+            entities.append(NutrisliceCategoryCountSensor(coordinator, entry, category))
+    if entry.options.get(CONF_DIAGNOSTIC_SENSORS, False):
+        entities.extend(
+            NutrisliceDiagnosticSensor(coordinator, entry, description)
+            for description in DIAGNOSTIC_SENSORS
+        )
+    async_add_entities(entities)
 
     platform = entity_platform.async_get_current_platform()
 
@@ -53,19 +94,31 @@ async def async_setup_entry(
             vol.Required("date"): str,
         },
         "set_target_date",
+        required_features=[NutrisliceSensorFeature.MENU],
+    )
+
+    # The full menu window is served on demand rather than pushed on every
+    # state write when compact attributes are enabled.
+    platform.async_register_entity_service(
+        "get_menu",
+        None,
+        "async_get_menu",
+        required_features=[NutrisliceSensorFeature.MENU],
+        supports_response=SupportsResponse.ONLY,
     )
 
 
-class NutrisliceSensor(
+class NutrisliceBaseSensor(
     CoordinatorEntity[NutrisliceDataUpdateCoordinator], SensorEntity
 ):
-    """Representation of a Nutrislice Sensor.
+    """Base class of the Nutrislice sensors.
 
-    This sensor displays the available menu items for a specific school and meal type.
-    The primary state reflects the number of items in the first selected category (usually 'entree').
-    Detailed menu information is available in the extra state attributes.
+    Handles the target date, its rollover and skipping state writes that would
+    render the same as the last one.
     """
 
+    _attr_supported_features = NutrisliceSensorFeature.MENU
+
     def __init__(
         self,
         coordinator: NutrisliceDataUpdateCoordinator,
@@ -77,7 +130,6 @@ class NutrisliceSensor(
         self.district = entry.data[CONF_DISTRICT]
         self.school_name = entry.data[CONF_SCHOOL_NAME]
         self.meal_type = entry.data[CONF_MEAL_TYPE]
-        self.categories = entry.data.get(CONF_CATEGORIES, DEFAULT_CATEGORIES)
 
         self._attr_name = (
             f"{self.school_name.replace('-', ' ').title()} {self.meal_type.title()}"
@@ -87,19 +139,95 @@ class NutrisliceSensor(
         )
         self._attr_icon = "mdi:food-apple"
         self._target_date: str | None = None
+        self._unsub_rollover: CALLBACK_TYPE | None = None
+        # What the last written state was rendered from
+        self._render_key: tuple[Any, ...] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Schedule the re-renders at the points where the displayed days change."""
+        await super().async_added_to_hass()
+        # The entity platform writes the first state once the entity is added
+        self._render_key = (self.coordinator.stale, self._get_render_key())
+        self._async_schedule_rollover()
+        self.async_on_remove(self._async_cancel_rollover)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the refresh changed what the sensor shows."""
+        self._async_write_if_changed()
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write the state unless it would render the same as the last one.
+
+        The render is keyed by the dates shown and the digests of the days they
+        are rendered from, so an unchanged state costs no recorder row or state
+        changed event.
+        """
+        render_key = (self.coordinator.stale, self._get_render_key())
+        if render_key == self._render_key:
+            return
+        self._render_key = render_key
+        self.async_write_ha_state()
+
+    def _get_render_key(self) -> tuple[Any, ...]:
+        """Return what the state and attributes are rendered from."""
+        target_str = self._target_date_str
+        day = (
+            self.coordinator.data.get_day(target_str) if self.coordinator.data else None
+        )
+        return (self.available, target_str, day.digest if day else None)
+
+    @callback
+    def _async_schedule_rollover(self) -> None:
+        """Schedule a state write at the next rollover point.
+
+        The target date moves to tomorrow at the rollover hour, and today and
+        tomorrow change at midnight. Both only need the cached menu, so they
+        do not wait for the next coordinator refresh. Both are in the time
+        zone of Home Assistant, like the dates they move.
+        """
+        now = dt_util.now()
+        cutoff = now.replace(
+            hour=TARGET_DATE_ROLLOVER_HOUR, minute=0, second=0, microsecond=0
+        )
+        midnight = dt_util.start_of_local_day(now.date() + timedelta(days=1))
+        next_point = cutoff if now < cutoff else midnight
+
+        self._unsub_rollover = async_track_point_in_time(
+            self.hass, self._async_handle_rollover, next_point
+        )
+
+    @callback
+    def _async_handle_rollover(self, _now: datetime) -> None:
+        """Re-render the state from cached data and schedule the next rollover."""
+        self._unsub_rollover = None
+        self._async_write_if_changed()
+        self._async_schedule_rollover()
+
+    @callback
+    def _async_cancel_rollover(self) -> None:
+        """Cancel the pending rollover."""
+        if self._unsub_rollover is not None:
+            self._unsub_rollover()
+            self._unsub_rollover = None
 
     async def set_target_date(self, date: str) -> None:
         """Handle the service call to set the target date for this sensor."""
         if date.lower() == "today":
-            self._target_date = datetime.now().strftime("%Y-%m-%d")
+            self._target_date = dt_util.now().strftime("%Y-%m-%d")
         elif date.lower() == "tomorrow":
-            self._target_date = (datetime.now() + timedelta(days=1)).strftime(
-                "%Y-%m-%d"
-            )
+            self._target_date = (dt_util.now() + timedelta(days=1)).strftime("%Y-%m-%d")
         else:
             self._target_date = date
 
-        self.async_write_ha_state()
+        self._async_write_if_changed()
+
+    async def async_get_menu(self) -> ServiceResponse:
+        """Handle the service call returning every parsed day of the menu window."""
+        if not self.coordinator.data:
+            return {"days": []}
+        return {"days": self.coordinator.data.parsed_days()}
 
     @property
     def _target_date_str(self) -> str:
@@ -107,35 +235,77 @@ class NutrisliceSensor(
         if self._target_date:
             return self._target_date
 
-        now = datetime.now()
-        if now.hour >= 13:
+        now = dt_util.now()
+        if now.hour >= TARGET_DATE_ROLLOVER_HOUR:
             return (now + timedelta(days=1)).strftime("%Y-%m-%d")
         return now.strftime("%Y-%m-%d")
 
-    def _get_items_for_category(
-        self, day: dict[str, Any], category: str
-    ) -> list[dict[str, Any]]:
-        """Get items for a specific category using flexible matching."""
-        allowed_aliases = [category]
-        if category == "sides":
-            allowed_aliases.extend(["vegetable", "fruit", "gain"])
+    @property
+    def _target_day(self) -> DayMenu | None:
+        """Return the parsed target day, if it is in the menu."""
+        if not self.coordinator.data:
+            return None
+        return self.coordinator.data.get_day(self._target_date_str)
 
-        foods = []
-        for item in day.get("menu_items", []):
-            if not item.get("food"):
-                continue
 
-            item_cat = item.get("category")
-            if not item_cat and item.get("food"):
-                item_cat = item["food"].get("food_category")
+class NutrisliceSensor(NutrisliceBaseSensor):
+    """Representation of a Nutrislice Sensor.
 
-            cat = (item_cat or "").lower()
-            if not cat:
-                continue
+    This sensor displays the available menu items for a specific school and meal type.
+    The primary state reflects the number of items in the first selected category (usually 'entree').
+    Detailed menu information is available in the extra state attributes.
+    """
 
-            if any(cat.startswith(a) or a.startswith(cat) for a in allowed_aliases):
-                foods.append(item)
-        return foods
+    # The parsed days are bulky and change with every refresh, keep them out
+    # of the recorder.
+    _unrecorded_attributes = frozenset({"days"})
+
+    def __init__(
+        self,
+        coordinator: NutrisliceDataUpdateCoordinator,
+        entry: ConfigEntry,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self.categories = entry.data.get(CONF_CATEGORIES, DEFAULT_CATEGORIES)
+        self.compact_attributes = entry.options.get(CONF_COMPACT_ATTRIBUTES, False)
+        self.measure_state = entry.options.get(CONF_DIAGNOSTIC_SENSORS, False)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, recording what rendering it cost."""
+        started = perf_counter()
+        super().async_write_ha_state()
+        stats = self.coordinator.stats
+        stats.render_duration = perf_counter() - started
+        # Serializing a large state costs as much as rendering it, only pay
+        # for it when the diagnostic sensors show it.
+        if (
+            self.measure_state
+            and (state := self.hass.states.get(self.entity_id)) is not None
+        ):
+            # Serialized once for all the consumers of the state
+            stats.state_size = len(state.as_dict_json)
+
+    def _get_render_key(self) -> tuple[Any, ...]:
+        """Return what the state and attributes are rendered from."""
+        menu = self.coordinator.data
+        now = dt_util.now()
+        dates = (
+            self._target_date_str,
+            now.strftime("%Y-%m-%d"),
+            (now + timedelta(days=1)).strftime("%Y-%m-%d"),
+        )
+        if not menu:
+            content: Any = None
+        elif self.compact_attributes:
+            content = tuple(
+                day.digest if (day := menu.get_day(date_str)) else None
+                for date_str in dates
+            )
+        else:
+            content = tuple(day.digest for day in menu.days.values())
+        return (self.available, dates, content)
 
     @property
     def native_value(self) -> str:
@@ -146,119 +316,43 @@ class NutrisliceSensor(
         if not self.coordinator.data:
             return "unavailable"
 
-        target_str = self._target_date_str
         main_cat = self.categories[0] if self.categories else "entree"
 
-        for day in self._get_all_days():
-            if day.get("date") == target_str:
-                # Check if it's a holiday
-                for item in day.get("menu_items", []):
-                    if item.get("is_holiday"):
-                        return item.get("text", "Holiday")
-
-                foods = self._get_items_for_category(day, main_cat)
-                if foods:
-                    return f"{len(foods)} {main_cat.title()}s Available"
-                return f"No {main_cat.title()}s/Weekend"
+        day = self.coordinator.data.get_day(self._target_date_str)
+        if day is None:
+            return "unknown"
 
-        return "unknown"
+        if day.is_holiday:
+            return day.holiday_name
 
-    def _get_all_days(self) -> list[dict[str, Any]]:
-        """Get a deduplicated and sorted list of all days from the coordinator."""
-        if not self.coordinator.data:
-            return []
-
-        all_days_raw = []
-        if self.coordinator.data.get("previous_week"):
-            all_days_raw.extend(self.coordinator.data["previous_week"].get("days", []))
-        if self.coordinator.data.get("current_week"):
-            all_days_raw.extend(self.coordinator.data["current_week"].get("days", []))
-        if self.coordinator.data.get("next_week"):
-            all_days_raw.extend(self.coordinator.data["next_week"].get("days", []))
-
-        # Deduplicate by date and sort
-        unique_days = {}
-        for day in all_days_raw:
-            date_str = day.get("date")
-            if date_str and date_str not in unique_days:
-                unique_days[date_str] = day
-
-        return [unique_days[d] for d in sorted(unique_days.keys())]
-
-    def _parse_day_data(self, day: dict[str, Any]) -> dict[str, Any]:
-        """Parse raw day data into a structured format for the frontend."""
-        date_str = day.get("date")
-        if not date_str:
-            return {}
-
-        day_data = {
-            "date": date_str,
-            "is_holiday": False,
-            "holiday_name": None,
-            "menu_items": [],
-            "has_menu": False,
-        }
-
-        for item in day.get("menu_items", []):
-            if item.get("is_holiday"):
-                day_data["is_holiday"] = True
-                day_data["holiday_name"] = item.get("text", "Holiday")
-                break
-
-            category = item.get("category")
-            if not category and item.get("food"):
-                category = item["food"].get("food_category")
-
-            if category:
-                category = category.lower()
-
-            if item.get("food"):
-                name = item["food"].get("name", "").strip()
-                if name and name != "Menu Subject to Change":
-                    day_data["menu_items"].append(
-                        {
-                            "name": name,
-                            "category": category or "other",
-                        }
-                    )
-                    day_data["has_menu"] = True
-
-        if day_data["is_holiday"]:
-            day_data["menu_summary"] = day_data["holiday_name"]
-        elif day_data["menu_items"]:
-            day_data["menu_summary"] = ", ".join(
-                [item["name"] for item in day_data["menu_items"]]
-            )
-        else:
-            day_data["menu_summary"] = "No menu"
-
-        return day_data
+        if foods := day.get_items(main_cat):
+            return f"{len(foods)} {main_cat.title()}s Available"
+        return f"No {main_cat.title()}s/Weekend"
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
-        if not self.coordinator.data:
+        menu = self.coordinator.data
+        if not menu:
             return {}
 
-        parsed_days = []
-        for day in self._get_all_days():
-            day_data = self._parse_day_data(day)
-            if day_data:
-                parsed_days.append(day_data)
-
         target_str = self._target_date_str
 
-        today_str_abs = datetime.now().strftime("%Y-%m-%d")
-        tomorrow_str_abs = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        today_str_abs = dt_util.now().strftime("%Y-%m-%d")
+        tomorrow_str_abs = (dt_util.now() + timedelta(days=1)).strftime("%Y-%m-%d")
 
-        today_menu = next(
-            (d["menu_summary"] for d in parsed_days if d["date"] == today_str_abs),
-            "No menu",
-        )
-        tomorrow_menu = next(
-            (d["menu_summary"] for d in parsed_days if d["date"] == tomorrow_str_abs),
-            "No menu",
-        )
+        today = menu.get_day(today_str_abs)
+        tomorrow = menu.get_day(tomorrow_str_abs)
+
+        if self.compact_attributes:
+            # Only the days the sensor is about: target, today and tomorrow
+            days = [
+                day.as_dict()
+                for date_str in sorted({target_str, today_str_abs, tomorrow_str_abs})
+                if (day := menu.get_day(date_str)) is not None
+            ]
+        else:
+            days = menu.parsed_days()
 
         return {
             "get_target_date": target_str,  # Keep for existing logic if any
@@ -267,7 +361,232 @@ class NutrisliceSensor(
             "school_name": self.school_name,
             "meal_type": self.meal_type,
             "categories": self.categories,
-            "today_menu": today_menu,
-            "tomorrow_menu": tomorrow_menu,
-            "days": parsed_days,
+            "today_menu": today.menu_summary if today else "No menu",
+            "tomorrow_menu": tomorrow.menu_summary if tomorrow else "No menu",
+            "stale": self.coordinator.stale,
+            "days": days,
         }
+
+
+class NutrisliceCategorySensor(NutrisliceBaseSensor):
+    """Sensor listing the items of one category on the target date."""
+
+    def __init__(
+        self,
+        coordinator: NutrisliceDataUpdateCoordinator,
+        entry: ConfigEntry,
+        category: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self.category = category
+        self._attr_name = f"{self._attr_name} {category.title()}"
+        self._attr_unique_id = f"{self._attr_unique_id}_{category}"
+
+    @property
+    def native_value(self) -> str | None:
+        """Return the items of the category, or the holiday."""
+        if (day := self._target_day) is None:
+            return None
+        if day.is_holiday:
+            return day.holiday_name
+        names = ", ".join(item.name for item in day.get_displayed_items(self.category))
+        return names[:MAX_LENGTH_STATE_STATE] or "No menu"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        day = self._target_day
+        return {
+            "target_date": self._target_date_str,
+            "category": self.category,
+            "stale": self.coordinator.stale,
+            "items": [item.name for item in day.get_displayed_items(self.category)]
+            if day
+            else [],
+        }
+
+
+class NutrisliceCategoryCountSensor(NutrisliceBaseSensor):
+    """Sensor counting the items of one category on the target date."""
+
+    def __init__(
+        self,
+        coordinator: NutrisliceDataUpdateCoordinator,
+        entry: ConfigEntry,
+        category: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, entry)
+        self.category = category
+        self._attr_name = f"{self._attr_name} {category.title()} Count"
+        self._attr_unique_id = f"{self._attr_unique_id}_{category}_count"
+        self._attr_icon = "mdi:counter"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the number of items of the category, zero on holidays."""
+        if (day := self._target_day) is None:
+            return None
+        if day.is_holiday:
+            return 0
+        return len(day.get_items(self.category))
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the state attributes."""
+        return {
+            "target_date": self._target_date_str,
+            "category": self.category,
+            "stale": self.coordinator.stale,
+        }
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Return a duration in seconds as rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class NutrisliceDiagnosticSensorDescription(SensorEntityDescription):
+    """Describes a diagnostic sensor of what an entry costs."""
+
+    value_fn: Callable[[NutrisliceDataUpdateCoordinator], Any]
+    attributes_fn: (
+        Callable[[NutrisliceDataUpdateCoordinator], dict[str, Any]] | None
+    ) = None
+
+
+DIAGNOSTIC_SENSORS = (
+    NutrisliceDiagnosticSensorDescription(
+        key="last_refresh",
+        name="Last refresh",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda coordinator: coordinator.stats.last_success,
+    ),
+    NutrisliceDiagnosticSensorDescription(
+        key="refresh_duration",
+        name="Refresh duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _milliseconds(coordinator.stats.refresh_duration),
+        attributes_fn=lambda coordinator: {
+            "parse_duration": _milliseconds(coordinator.stats.parse_duration),
+            "render_duration": _milliseconds(coordinator.stats.render_duration),
+        },
+    ),
+    NutrisliceDiagnosticSensorDescription(
+        key="fetch_latency",
+        name="Fetch latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: max(
+            (
+                _milliseconds(stats.latency)
+                for stats in coordinator.window_fetch_stats().values()
+                if stats.latency is not None
+            ),
+            default=None,
+        ),
+        attributes_fn=lambda coordinator: {
+            f"{key}_{name}": _milliseconds(value)
+            for key, stats in coordinator.window_fetch_stats().items()
+            for name, value in (
+                ("latency", stats.latency),
+                ("decode_time", stats.decode_time),
+            )
+        },
+    ),
+    NutrisliceDiagnosticSensorDescription(
+        key="payload_size",
+        name="Payload size",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: sum(
+            stats.payload_bytes or 0
+            for stats in coordinator.window_fetch_stats().values()
+        ),
+    ),
+    NutrisliceDiagnosticSensorDescription(
+        key="state_size",
+        name="State size",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.stats.state_size,
+    ),
+    NutrisliceDiagnosticSensorDescription(
+        key="requests",
+        name="Requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: sum(
+            stats.requests for stats in coordinator.window_fetch_stats().values()
+        ),
+        attributes_fn=lambda coordinator: {
+            name: sum(
+                getattr(stats, name)
+                for stats in coordinator.window_fetch_stats().values()
+            )
+            for name in ("cache_hits", "not_modified", "retries", "errors")
+        },
+    ),
+)
+
+
+class NutrisliceDiagnosticSensor(
+    CoordinatorEntity[NutrisliceDataUpdateCoordinator], SensorEntity
+):
+    """Sensor reporting what fetching and rendering the menu of an entry costs.
+
+    Updated after every refresh, including the ones that do not change the
+    menu.
+    """
+
+    entity_description: NutrisliceDiagnosticSensorDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator: NutrisliceDataUpdateCoordinator,
+        entry: ConfigEntry,
+        description: NutrisliceDiagnosticSensorDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        school_name = entry.data[CONF_SCHOOL_NAME]
+        meal_type = entry.data[CONF_MEAL_TYPE]
+        self._attr_name = (
+            f"{school_name.replace('-', ' ').title()} {meal_type.title()} "
+            f"{description.name}"
+        )
+        self._attr_unique_id = (
+            f"nutrislice_{entry.data[CONF_DISTRICT]}_{school_name}_{meal_type}"
+            f"_{description.key}"
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the refreshes of the entry."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_REFRESHED.format(self.coordinator.config_entry.entry_id),
+                self.async_write_ha_state,
+            )
+        )
+
+    @property
+    def native_value(self) -> Any:
+        """Return the value of the sensor."""
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the details of the value."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.coordinator)
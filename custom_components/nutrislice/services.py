@@ -0,0 +1,205 @@
+"""Integration-wide services of Nutrislice."""
+
+from __future__ import annotations
+
+import sqlite3
+from collections.abc import Awaitable, Callable
+from functools import partial
+from pathlib import Path
+
+import aiohttp
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceValidationError,
+    Unauthorized,
+    UnknownUser,
+)
+from homeassistant.helpers import config_validation as cv
+
+from .api import NutrisliceApiError, NutrisliceUnavailableError
+from .bulk_import import MENUS_FILE_SUFFIXES, async_import_menus, read_menus_file
+from .const import (
+    DOMAIN,
+    EXPORT_DIR,
+    HISTORY_LIMIT,
+    HISTORY_MAX_LIMIT,
+    MAX_EXPORT_RANGE,
+)
+from .coordinator import NutrisliceDataUpdateCoordinator
+from .export import EXPORT_FORMATS, async_export_menus
+from .history import get_menu_history
+
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_EXPORT = "export"
+SERVICE_IMPORT_MENUS = "import_menus"
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("config_entry_id"): cv.string,
+        vol.Optional("start_date"): cv.date,
+        vol.Optional("end_date"): cv.date,
+        vol.Optional("food"): cv.string,
+        vol.Optional("category"): cv.string,
+        vol.Optional("limit", default=HISTORY_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=HISTORY_MAX_LIMIT)
+        ),
+    }
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Required("config_entry_id"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Required("start_date"): cv.date,
+        vol.Required("end_date"): cv.date,
+        vol.Required("filename"): cv.string,
+        vol.Optional("format", default="jsonl"): vol.In(EXPORT_FORMATS),
+    }
+)
+
+IMPORT_MENUS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Exclusive("menus", "source"): vol.All(cv.ensure_list, [dict]),
+            vol.Exclusive("filename", "source"): cv.string,
+        }
+    ),
+    cv.has_at_least_one_key("menus", "filename"),
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        partial(_async_admin_call, _async_export, hass),
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_MENUS,
+        partial(_async_admin_call, _async_import_menus, hass),
+        schema=IMPORT_MENUS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        partial(_async_get_history, hass),
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+async def _async_admin_call(
+    handler: Callable[[HomeAssistant, ServiceCall], Awaitable[ServiceResponse]],
+    hass: HomeAssistant,
+    call: ServiceCall,
+) -> ServiceResponse:
+    """Run a service that only admin users may call.
+
+    Like async_register_admin_service, which does not return responses.
+    """
+    if call.context.user_id:
+        user = await hass.auth.async_get_user(call.context.user_id)
+        if user is None:
+            raise UnknownUser(context=call.context)
+        if not user.is_admin:
+            raise Unauthorized(context=call.context)
+    return await handler(hass, call)
+
+
+async def _async_get_history(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Return archived days and how often each food was served."""
+    entry_id = call.data.get("config_entry_id")
+    if entry_id is not None and (
+        (entry := hass.config_entries.async_get_entry(entry_id)) is None
+        or entry.domain != DOMAIN
+    ):
+        raise ServiceValidationError(f"Unknown Nutrislice entry {entry_id}")
+
+    start, end = call.data.get("start_date"), call.data.get("end_date")
+    try:
+        return await get_menu_history(hass).async_query(
+            entry_id,
+            start.isoformat() if start else None,
+            end.isoformat() if end else None,
+            call.data.get("food"),
+            call.data.get("category"),
+            call.data["limit"],
+        )
+    except sqlite3.Error as err:
+        raise HomeAssistantError(f"Could not read the menu history: {err}") from err
+
+
+def _config_path(hass: HomeAssistant, filename: str, directory: str = "") -> Path:
+    """Return the path of a file, which must be in a directory of the config dir."""
+    base = Path(hass.config.path(directory)).resolve()
+    path = (base / filename).resolve()
+    if path == base or not path.is_relative_to(base):
+        raise ServiceValidationError(f"Files must be under {base}")
+    return path
+
+
+async def _async_export(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Write the menus of entries between two dates to a file."""
+    coordinators = []
+    for entry_id in call.data["config_entry_id"]:
+        coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+        if not isinstance(coordinator, NutrisliceDataUpdateCoordinator):
+            raise ServiceValidationError(f"Nutrislice entry {entry_id} is not loaded")
+        coordinators.append(coordinator)
+
+    start, end = call.data["start_date"], call.data["end_date"]
+    if end < start or end - start > MAX_EXPORT_RANGE:
+        raise ServiceValidationError(
+            f"Date range must be ordered and span at most {MAX_EXPORT_RANGE.days} days"
+        )
+    # Never overwrite the configuration, or anything else than an export
+    path = _config_path(hass, call.data["filename"], EXPORT_DIR)
+    if path.suffix.lower() != f".{call.data['format']}":
+        raise ServiceValidationError(
+            f"{call.data['format'].upper()} exports must end with .{call.data['format']}"
+        )
+
+    try:
+        return await async_export_menus(
+            hass, coordinators, start, end, path, call.data["format"]
+        )
+    except (
+        aiohttp.ClientError,
+        TimeoutError,
+        NutrisliceApiError,
+        NutrisliceUnavailableError,
+    ) as err:
+        raise HomeAssistantError(f"Could not fetch the menus: {err}") from err
+    except OSError as err:
+        raise HomeAssistantError(f"Could not write {path}: {err}") from err
+
+
+async def _async_import_menus(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Create entries for a list of menus, given or read from a file."""
+    if "menus" in call.data:
+        return await async_import_menus(hass, call.data["menus"])
+
+    path = _config_path(hass, call.data["filename"])
+    if path.suffix.lower() not in MENUS_FILE_SUFFIXES:
+        raise ServiceValidationError("Menus are read from YAML or CSV files")
+    try:
+        menus = await hass.async_add_executor_job(read_menus_file, path)
+    except (OSError, HomeAssistantError) as err:
+        raise ServiceValidationError(f"Could not read {path}: {err}") from err
+    # Whatever the file holds, only report where its invalid rows are
+    return await async_import_menus(hass, menus, echo_invalid=False)
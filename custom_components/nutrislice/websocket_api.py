@@ -0,0 +1,118 @@
+"""WebSocket API for the Nutrislice Lovelace card."""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Any
+
+import aiohttp
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+
+from .api import NutrisliceApiError, NutrisliceUnavailableError
+from .const import DOMAIN, HISTORY_LIMIT, HISTORY_MAX_LIMIT, MAX_MENU_RANGE
+from .coordinator import NutrisliceDataUpdateCoordinator
+from .history import get_menu_history
+
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    """Register the WebSocket commands."""
+    websocket_api.async_register_command(hass, websocket_get_menu)
+    websocket_api.async_register_command(hass, websocket_get_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "nutrislice/menu",
+        vol.Required("entry_id"): str,
+        vol.Required("start_date"): cv.date,
+        vol.Required("end_date"): cv.date,
+    }
+)
+@websocket_api.async_response
+async def websocket_get_menu(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the parsed menu of an entry between two dates.
+
+    Lets the card browse days without changing the sensor state. Days of the
+    refresh window come from the coordinator, other weeks are fetched lazily.
+    """
+    coordinator = hass.data.get(DOMAIN, {}).get(msg["entry_id"])
+    if not isinstance(coordinator, NutrisliceDataUpdateCoordinator):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not found"
+        )
+        return
+
+    start, end = msg["start_date"], msg["end_date"]
+    if end < start or end - start > MAX_MENU_RANGE:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_INVALID_FORMAT,
+            f"Date range must be ordered and span at most {MAX_MENU_RANGE.days} days",
+        )
+        return
+
+    try:
+        days = await coordinator.async_get_days(start, end)
+    except (
+        aiohttp.ClientError,
+        TimeoutError,
+        NutrisliceApiError,
+        NutrisliceUnavailableError,
+    ) as err:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_HOME_ASSISTANT_ERROR, str(err)
+        )
+        return
+
+    connection.send_result(msg["id"], {"days": [day.as_dict() for day in days]})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "nutrislice/history",
+        vol.Optional("entry_id"): str,
+        vol.Optional("start_date"): cv.date,
+        vol.Optional("end_date"): cv.date,
+        vol.Optional("food"): str,
+        vol.Optional("category"): str,
+        vol.Optional("limit", default=HISTORY_LIMIT): vol.All(
+            int, vol.Range(min=1, max=HISTORY_MAX_LIMIT)
+        ),
+    }
+)
+@websocket_api.async_response
+async def websocket_get_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return archived days and how often each food was served.
+
+    Unlike nutrislice/menu, the range is not limited: the archive answers
+    from its indexes without fetching anything, up to limit days.
+    """
+    start, end = msg.get("start_date"), msg.get("end_date")
+    try:
+        result = await get_menu_history(hass).async_query(
+            msg.get("entry_id"),
+            start.isoformat() if start else None,
+            end.isoformat() if end else None,
+            msg.get("food"),
+            msg.get("category"),
+            msg["limit"],
+        )
+    except sqlite3.Error as err:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_HOME_ASSISTANT_ERROR, str(err)
+        )
+        return
+
+    connection.send_result(msg["id"], result)
@@ -13,6 +13,22 @@ def auto_enable_custom_integrations(enable_custom_integrations):
     yield
 
 
+@pytest.fixture(autouse=True)
+def no_retry_backoff():
+    """Retry failed requests without waiting."""
+    with patch("custom_components.nutrislice.api.FETCH_RETRY_BACKOFF", 0):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def history_db(tmp_path):
+    """Archive past menus in a temporary database."""
+    with patch(
+        "custom_components.nutrislice.history.HISTORY_DB", str(tmp_path / "history.db")
+    ):
+        yield
+
+
 @pytest.fixture
 def mock_setup_entry():
     """Override async_setup_entry."""
@@ -0,0 +1,141 @@
+"""A local stand-in for the Nutrislice API, for integration and soak tests."""
+
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import date
+
+from aiohttp import hdrs, web
+from aiohttp.test_utils import TestServer
+
+from .payloads import week_payload
+
+WEEK_ROUTE = (
+    "/{district}/menu/api/weeks/school/{school}/menu-type/{meal}"
+    "/{year:\\d+}/{month:\\d+}/{day:\\d+}/"
+)
+
+
+@dataclass
+class FakeNutrisliceConfig:
+    """How the fake API answers."""
+
+    # Seconds before answering, with up to `jitter` more
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Share of requests answered with a 500
+    error_rate: float = 0.0
+    # Weeks starting after this day are not published and answer 404
+    published_until: date | None = None
+    # Send ETags and answer 304 to matching If-None-Match headers
+    etags: bool = True
+    # Size of the weeks
+    items_per_day: int = 15
+    seed: int = 0
+
+
+@dataclass
+class FakeNutrisliceStats:
+    """What the fake API was asked."""
+
+    requests: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    not_found: int = 0
+    bytes_sent: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    paths: set[str] = field(default_factory=set)
+
+
+class FakeNutrislice:
+    """Serve generated weeks on the Nutrislice week routes.
+
+    Districts are the first segment of the path, as the real API has a host
+    per district. Point the integration at it by patching API_BASE_URL with
+    `base_url`. The schools of a district serve the same menus, so a soak of
+    many schools does not spend its time generating them.
+    """
+
+    def __init__(self, config: FakeNutrisliceConfig | None = None) -> None:
+        """Initialize the server, not started."""
+        self.config = config or FakeNutrisliceConfig()
+        self.stats = FakeNutrisliceStats()
+        self._bodies: dict[tuple[str, ...], tuple[bytes, str]] = {}
+        self._random = random.Random(self.config.seed)
+        app = web.Application()
+        app.router.add_get(WEEK_ROUTE, self._handle_week)
+        self.server = TestServer(app)
+
+    @property
+    def base_url(self) -> str:
+        """Return the API_BASE_URL template serving the districts."""
+        return f"http://{self.server.host}:{self.server.port}/{{district}}"
+
+    async def start(self) -> None:
+        """Start serving."""
+        await self.server.start_server()
+
+    async def close(self) -> None:
+        """Stop serving."""
+        await self.server.close()
+
+    def _body(self, key: tuple[str, ...], start: date) -> tuple[bytes, str]:
+        """Return the body of a week and its ETag, generated once."""
+        if (cached := self._bodies.get(key)) is None:
+            body = json.dumps(
+                week_payload(
+                    start,
+                    items_per_day=self.config.items_per_day,
+                    seed=self.config.seed
+                    + int.from_bytes(
+                        hashlib.blake2b(
+                            "/".join(key[:2]).encode(), digest_size=2
+                        ).digest()
+                    ),
+                )
+            ).encode()
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            cached = self._bodies[key] = (body, etag)
+        return cached
+
+    async def _handle_week(self, request: web.Request) -> web.Response:
+        """Answer a week request."""
+        stats = self.stats
+        stats.requests += 1
+        stats.paths.add(request.path)
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            config = self.config
+            if config.latency or config.jitter:
+                await asyncio.sleep(
+                    config.latency + self._random.uniform(0, config.jitter)
+                )
+            if self._random.random() < config.error_rate:
+                stats.errors += 1
+                return web.Response(status=500)
+
+            info = request.match_info
+            start = date(int(info["year"]), int(info["month"]), int(info["day"]))
+            if config.published_until is not None and start > config.published_until:
+                stats.not_found += 1
+                return web.Response(status=404)
+
+            body, etag = self._body(
+                (info["district"], info["meal"], start.isoformat()), start
+            )
+            if config.etags and request.headers.get(hdrs.IF_NONE_MATCH) == etag:
+                stats.not_modified += 1
+                return web.Response(status=304, headers={hdrs.ETAG: etag})
+
+            stats.bytes_sent += len(body)
+            return web.Response(
+                body=body,
+                content_type="application/json",
+                headers={hdrs.ETAG: etag} if config.etags else None,
+            )
+        finally:
+            stats.in_flight -= 1
@@ -0,0 +1,128 @@
+"""Synthetic Nutrislice payloads for tests and benchmarks."""
+
+import random
+from datetime import date, timedelta
+from typing import Any
+
+NUTRIENTS = (
+    "calories",
+    "g_fat",
+    "g_saturated_fat",
+    "g_trans_fat",
+    "mg_cholesterol",
+    "g_carbs",
+    "g_added_sugar",
+    "g_sugar",
+    "mg_potassium",
+    "mg_sodium",
+    "g_fiber",
+    "g_protein",
+    "mg_iron",
+    "mg_calcium",
+    "mg_vitamin_c",
+    "iu_vitamin_a",
+)
+
+FOOD_CATEGORIES = ("entree", "vegetable", "fruit", "grain", "milk", "condiment", "")
+
+
+def _food(rng: random.Random, food_id: int) -> dict[str, Any]:
+    """Return a food with the fields the API sends."""
+    return {
+        "id": food_id,
+        "name": f"Food {food_id}",
+        "description": f"Description of food {food_id}. " * rng.randint(1, 6),
+        "subtext": "",
+        "image_url": f"https://images.example.com/{food_id}.jpg",
+        "hoverpic": f"https://images.example.com/{food_id}-hover.jpg",
+        "thumbnail_url": f"https://images.example.com/{food_id}-t.jpg",
+        "food_category": rng.choice(FOOD_CATEGORIES),
+        "rounded_nutrition_info": {
+            nutrient: round(rng.uniform(0, 500), 1) for nutrient in NUTRIENTS
+        },
+        "serving_size_info": {
+            "serving_size_amount": str(rng.randint(1, 4)),
+            "serving_size_unit": "each",
+        },
+        "icons": {
+            "food_icons": [
+                {"id": icon, "synced_name": "Vegetarian", "enabled": True}
+                for icon in range(rng.randint(0, 4))
+            ],
+            "myplate_icons": [],
+        },
+        "ingredients": "Flour, water, salt, yeast, cheese, tomato, oil",
+    }
+
+
+def week_payload(
+    start: date,
+    *,
+    items_per_day: int = 15,
+    foods: int = 200,
+    holidays: tuple[int, ...] = (),
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Return a week shaped like the API's, starting on the given Sunday.
+
+    School days draw their items from a pool of foods, like a district cycling
+    through its menus. Days listed in holidays (0 is Monday) have a holiday
+    item before their items.
+    """
+    rng = random.Random(seed + start.toordinal())
+    days = []
+    for weekday in range(7):
+        day = start + timedelta(days=weekday)
+        menu_items: list[dict[str, Any]] = []
+        if weekday in range(1, 6):
+            if weekday - 1 in holidays:
+                menu_items.append(
+                    {"is_holiday": True, "text": "No School", "position": 0}
+                )
+            for position in range(items_per_day):
+                if position % 8 == 0:
+                    menu_items.append(
+                        {"is_section_title": True, "text": "Hot Meals", "food": None}
+                    )
+                food = _food(rng, rng.randrange(foods))
+                menu_items.append(
+                    {
+                        "id": rng.randrange(10**6),
+                        "date": day.isoformat(),
+                        "position": position + 1,
+                        "is_section_title": False,
+                        "is_holiday": False,
+                        "text": "",
+                        "category": food["food_category"],
+                        "food": food,
+                    }
+                )
+        days.append(
+            {
+                "date": day.isoformat(),
+                "has_unpublished_menus": False,
+                "menu_info": {"1234": {"section_options": {"display_name": ""}}},
+                "menu_items": menu_items,
+            }
+        )
+    return {"start_date": start.isoformat(), "menu_type_id": 1234, "days": days}
+
+
+def window_payloads(
+    today: date, *, items_per_day: int = 15, seed: int = 0
+) -> dict[str, dict[str, Any]]:
+    """Return the previous, current and next weeks around a day."""
+    sunday = today - timedelta(days=(today.weekday() + 1) % 7)
+    return {
+        key: week_payload(
+            sunday + timedelta(days=7 * offset),
+            items_per_day=items_per_day,
+            holidays=(4,) if offset == 1 else (),
+            seed=seed,
+        )
+        for key, offset in (
+            ("previous_week", -1),
+            ("current_week", 0),
+            ("next_week", 1),
+        )
+    }
@@ -0,0 +1,310 @@
+"""Test the shared Nutrislice fetch registry."""
+
+import asyncio
+import re
+import time
+from datetime import date, timedelta
+from typing import Any
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+    AiohttpClientMockResponse,
+)
+
+from custom_components.nutrislice.api import (
+    CircuitBreaker,
+    NutrisliceApiError,
+    NutrisliceFetchRegistry,
+    NutrisliceUnavailableError,
+    week_start,
+    week_url,
+)
+from custom_components.nutrislice.const import (
+    BREAKER_COOLDOWN,
+    BREAKER_FAILURE_THRESHOLD,
+    FETCH_RETRIES,
+    MAX_REQUESTS_PER_HOST,
+    STORAGE_KEY_WEEKS,
+    WEEK_CACHE_RETENTION,
+)
+
+
+def _stored_week(hass_storage: dict[str, Any], day: date, **week: Any) -> str:
+    """Put a week in the persistent cache and return its URL."""
+    url = week_url("my-district", "elementary-school", "lunch", day)
+    hass_storage[STORAGE_KEY_WEEKS] = {
+        "version": 1,
+        "key": STORAGE_KEY_WEEKS,
+        "data": {"weeks": {url: {"week_start": week_start(day).isoformat(), **week}}},
+    }
+    return url
+
+
+def test_week_url_uses_week_start() -> None:
+    """Test every day of a week maps to the same URL."""
+    urls = {
+        week_url("d", "s", "lunch", date(2026, 2, 15) + timedelta(days=offset))
+        for offset in range(7)
+    }
+    assert urls == {
+        "https://d.api.nutrislice.com/menu/api/weeks/school/s/menu-type/lunch/2026/02/15/?format=json"
+    }
+
+
+@pytest.mark.asyncio
+async def test_conditional_request_reuses_stored_week(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """Test a 304 answer reuses the stored payload."""
+    today = dt_util.now().date()
+    url = _stored_week(
+        hass_storage,
+        today,
+        etag='"abc"',
+        last_modified="Mon, 16 Feb 2026 10:00:00 GMT",
+        data={"days": [{"date": "2026-02-17", "menu_items": []}]},
+    )
+    aioclient_mock.get(url, status=304)
+
+    registry = NutrisliceFetchRegistry(hass)
+    week = await registry.async_get_week(
+        "my-district", "elementary-school", "lunch", today
+    )
+
+    assert week == {"days": [{"date": "2026-02-17", "menu_items": []}]}
+    headers = aioclient_mock.mock_calls[0][3]
+    assert headers["If-None-Match"] == '"abc"'
+    assert headers["If-Modified-Since"] == "Mon, 16 Feb 2026 10:00:00 GMT"
+
+
+@pytest.mark.asyncio
+async def test_past_week_skips_network(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """Test a week that is over is served from storage."""
+    last_week = dt_util.now().date() - timedelta(days=7)
+    _stored_week(hass_storage, last_week, data={"days": []})
+
+    registry = NutrisliceFetchRegistry(hass)
+    week = await registry.async_get_week(
+        "my-district", "elementary-school", "lunch", last_week
+    )
+
+    assert week == {"days": []}
+    assert aioclient_mock.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_unavailable_week(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a week the API does not return raises with its status."""
+    today = dt_util.now().date()
+    aioclient_mock.get(
+        week_url("my-district", "elementary-school", "lunch", today), status=404
+    )
+
+    registry = NutrisliceFetchRegistry(hass)
+    with pytest.raises(NutrisliceApiError) as err:
+        await registry.async_get_week(
+            "my-district", "elementary-school", "lunch", today
+        )
+
+    assert err.value.status == 404
+
+
+@pytest.mark.asyncio
+async def test_finished_request_is_not_joined(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a finished request still tracked in flight is not reused."""
+    today = dt_util.now().date()
+    url = week_url("my-district", "elementary-school", "lunch", today)
+    aioclient_mock.get(url, json={"days": []})
+    registry = NutrisliceFetchRegistry(hass)
+
+    # Failed, but its done callback has not run yet
+    stale = hass.loop.create_future()
+    stale.set_exception(aiohttp.ClientError())
+    registry._inflight[url] = stale
+
+    week = await registry.async_get_week(
+        "my-district", "elementary-school", "lunch", today
+    )
+    assert week == {"days": []}
+    assert aioclient_mock.call_count == 1
+
+    # The late callback of the stale request leaves a newer one alone
+    newer = registry._inflight[url] = hass.loop.create_future()
+    registry._forget_inflight(url, stale)
+    assert registry._inflight[url] is newer
+    newer.cancel()
+    stale.exception()
+
+
+@pytest.mark.asyncio
+async def test_stats_of_distant_weeks_are_dropped(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test stats are only kept for the weeks around today."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"), json={"days": []}
+    )
+    registry = NutrisliceFetchRegistry(hass)
+    today = dt_util.now().date()
+
+    # A year of weeks, as fetched by an export
+    for weeks in range(-52, 2):
+        await registry.async_get_week(
+            "my-district",
+            "elementary-school",
+            "lunch",
+            today + timedelta(weeks=weeks),
+            remember=False,
+        )
+
+    assert len(registry._stats) <= 2 * WEEK_CACHE_RETENTION.days // 7 + 2
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a failed request is retried within the same fetch."""
+    today = dt_util.now().date()
+    url = week_url("my-district", "elementary-school", "lunch", today)
+    statuses = [503, 200]
+
+    async def respond(method: str, url: Any, data: Any) -> AiohttpClientMockResponse:
+        return AiohttpClientMockResponse(
+            method, url, status=statuses.pop(0), json={"days": []}
+        )
+
+    aioclient_mock.get(url, side_effect=respond)
+
+    registry = NutrisliceFetchRegistry(hass)
+    week = await registry.async_get_week(
+        "my-district", "elementary-school", "lunch", today
+    )
+
+    assert week == {"days": []}
+    assert aioclient_mock.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """Test a failing district API is left alone until the cooldown is over."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"), status=500
+    )
+    registry = NutrisliceFetchRegistry(hass)
+    today = dt_util.now().date()
+
+    # Each failed fetch is retried, then counted once by the breaker
+    for week in range(BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(NutrisliceApiError):
+            await registry.async_get_week(
+                "my-district",
+                "elementary-school",
+                "lunch",
+                today + timedelta(days=7 * week),
+            )
+    assert aioclient_mock.call_count == BREAKER_FAILURE_THRESHOLD * (FETCH_RETRIES + 1)
+    assert registry.get_breaker("my-district").is_open
+
+    with pytest.raises(NutrisliceUnavailableError):
+        await registry.async_get_week("my-district", "middle-school", "lunch", today)
+    assert aioclient_mock.call_count == BREAKER_FAILURE_THRESHOLD * (FETCH_RETRIES + 1)
+
+    # Once the cooldown is over a single request is let through
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"), json={"days": []}
+    )
+    with patch(
+        "custom_components.nutrislice.api.time.monotonic",
+        return_value=time.monotonic() + BREAKER_COOLDOWN.total_seconds(),
+    ):
+        week = await registry.async_get_week(
+            "my-district", "middle-school", "lunch", today
+        )
+    assert week == {"days": []}
+    assert not registry.get_breaker("my-district").is_open
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_request(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a cancelled trial request lets the next request through."""
+
+    async def hang(method: str, url: Any, data: Any) -> AiohttpClientMockResponse:
+        await asyncio.Event().wait()
+
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"), side_effect=hang
+    )
+    registry = NutrisliceFetchRegistry(hass)
+    breaker = registry._breakers["my-district"] = CircuitBreaker(cooldown=timedelta(0))
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        breaker.record_failure()
+    today = dt_util.now().date()
+
+    caller = hass.async_create_task(
+        registry.async_get_week("my-district", "elementary-school", "lunch", today)
+    )
+    await asyncio.sleep(0.01)
+    assert not breaker.allow_request()
+
+    # Cancelled at shutdown
+    url = week_url("my-district", "elementary-school", "lunch", today)
+    registry._inflight[url].cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    assert breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_requests_per_host_are_capped(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test concurrent requests to a host are capped."""
+    in_flight = peak = 0
+
+    async def respond(method: str, url: Any, data: Any) -> AiohttpClientMockResponse:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return AiohttpClientMockResponse(method, url, json={"days": []})
+
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        side_effect=respond,
+    )
+    registry = NutrisliceFetchRegistry(hass)
+    today = dt_util.now().date()
+
+    await asyncio.gather(
+        *(
+            registry.async_get_week("my-district", f"school-{number}", "lunch", today)
+            for number in range(3 * MAX_REQUESTS_PER_HOST)
+        )
+    )
+
+    assert aioclient_mock.call_count == 3 * MAX_REQUESTS_PER_HOST
+    assert peak == MAX_REQUESTS_PER_HOST
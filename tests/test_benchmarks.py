@@ -0,0 +1,251 @@
+"""Benchmarks of parsing and rendering the menu, checked against baselines.
+
+Timings are divided by the time the machine takes to decode a reference week,
+measured right after each benchmark, so the baselines hold across machines and
+load. A benchmark fails when it gets more than TOLERANCE times slower than its
+baseline. Timings are too noisy for the default run, the benchmarks run with:
+
+    NUTRISLICE_BENCHMARKS=1 pytest tests/test_benchmarks.py
+
+After an intended change in performance, record new baselines with:
+
+    NUTRISLICE_UPDATE_BENCHMARKS=1 pytest tests/test_benchmarks.py
+"""
+
+import json
+import os
+import re
+import time
+from collections.abc import Callable, Iterator
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.const import CATEGORIES
+from custom_components.nutrislice.coordinator import NutrisliceDataUpdateCoordinator
+from custom_components.nutrislice.model import (
+    DayMenu,
+    FoodCatalog,
+    NutrisliceMenu,
+    project_week,
+)
+from custom_components.nutrislice.sensor import NutrisliceSensor
+
+from .payloads import week_payload, window_payloads
+
+BASELINES = Path(__file__).with_name("benchmark_baselines.json")
+UPDATE_BASELINES = os.environ.get("NUTRISLICE_UPDATE_BENCHMARKS") == "1"
+RUN_BENCHMARKS = UPDATE_BASELINES or os.environ.get("NUTRISLICE_BENCHMARKS") == "1"
+TOLERANCE = 3.0
+ROUNDS = 5
+MIN_ROUND_TIME = 0.005
+
+# Items per school day
+SCALES = (10, 40, 160)
+
+# Benchmarks run on a school day, the menu rendered does not depend on the date
+SCHOOL_DAY = datetime(2026, 2, 17, 10)
+
+pytestmark = pytest.mark.skipif(
+    not RUN_BENCHMARKS, reason="Set NUTRISLICE_BENCHMARKS=1 to run the benchmarks"
+)
+
+
+def _best_time(func: Callable[[], Any]) -> float:
+    """Return the best time of a call over a few rounds, in seconds."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        if (elapsed := time.perf_counter() - started) >= MIN_ROUND_TIME:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(ROUNDS - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return best / number
+
+
+def _calibration() -> float:
+    """Return the time this machine takes to decode a reference week."""
+    payload = json.dumps(week_payload(date(2026, 2, 15), items_per_day=40))
+    return _best_time(lambda: json.loads(payload))
+
+
+@pytest.fixture(scope="module")
+def baselines() -> Iterator[dict[str, float]]:
+    """Return the baselines, and save them back when updating them."""
+    recorded = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    yield recorded
+    if UPDATE_BASELINES:
+        BASELINES.write_text(
+            json.dumps(dict(sorted(recorded.items())), indent=2) + "\n"
+        )
+
+
+@pytest.fixture
+def check_benchmark(baselines: dict[str, float]) -> Callable[[str, float], None]:
+    """Return a function checking a timing against its baseline."""
+
+    def check(name: str, seconds: float) -> None:
+        # Calibrated under the same load as the benchmark
+        ratio = seconds / _calibration()
+        if UPDATE_BASELINES:
+            baselines[name] = float(f"{ratio:.3g}")
+            return
+        assert name in baselines, f"No baseline for {name}, record them first"
+        assert ratio <= baselines[name] * TOLERANCE, (
+            f"{name} took {ratio:.3g} reference decodes, baseline is {baselines[name]}"
+        )
+
+    return check
+
+
+def _window(items_per_day: int) -> dict[str, Any]:
+    """Return the projected weeks around the school day."""
+    return {
+        key: project_week(week)
+        for key, week in window_payloads(
+            SCHOOL_DAY.date(), items_per_day=items_per_day
+        ).items()
+    }
+
+
+@pytest.mark.parametrize("items_per_day", SCALES)
+def test_project_week(
+    items_per_day: int, check_benchmark: Callable[[str, float], None]
+) -> None:
+    """Benchmark projecting a raw week at ingest."""
+    week = week_payload(date(2026, 2, 15), items_per_day=items_per_day)
+    check_benchmark(
+        f"project_week[{items_per_day}]", _best_time(lambda: project_week(week))
+    )
+
+
+@pytest.mark.parametrize("items_per_day", SCALES)
+def test_parse_day(
+    items_per_day: int, check_benchmark: Callable[[str, float], None]
+) -> None:
+    """Benchmark parsing a day, formerly _parse_day_data."""
+    day = project_week(week_payload(date(2026, 2, 15), items_per_day=items_per_day))[
+        "days"
+    ][1]
+    catalog = FoodCatalog()
+    # Like the menu of the last refresh, keeps the foods in the catalog
+    parsed = DayMenu.from_payload(day, catalog)
+    check_benchmark(
+        f"parse_day[{items_per_day}]",
+        _best_time(lambda: DayMenu.from_payload(day, catalog)),
+    )
+    assert parsed.items
+
+
+@pytest.mark.parametrize("items_per_day", SCALES)
+def test_build_menu(
+    items_per_day: int, check_benchmark: Callable[[str, float], None]
+) -> None:
+    """Benchmark building the menu of the window, formerly _get_all_days."""
+    weeks = _window(items_per_day)
+    catalog = FoodCatalog()
+    # Like the menu of the last refresh, keeps the foods in the catalog
+    built = NutrisliceMenu.from_weeks(weeks, catalog)
+    check_benchmark(
+        f"build_menu[{items_per_day}]",
+        _best_time(lambda: NutrisliceMenu.from_weeks(weeks, catalog)),
+    )
+    assert built.days
+
+
+@pytest.mark.parametrize("items_per_day", SCALES)
+def test_items_for_category(
+    items_per_day: int, check_benchmark: Callable[[str, float], None]
+) -> None:
+    """Benchmark looking up every category of every day.
+
+    Formerly _get_items_for_category.
+    """
+    days = list(NutrisliceMenu.from_weeks(_window(items_per_day)).days.values())
+
+    def lookup() -> None:
+        for day in days:
+            for category in CATEGORIES:
+                day.get_items(category)
+
+    check_benchmark(f"items_for_category[{items_per_day}]", _best_time(lookup))
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("items_per_day", SCALES)
+@pytest.mark.asyncio
+async def test_render_sensor(
+    hass: HomeAssistant,
+    items_per_day: int,
+    compact: bool,
+    check_benchmark: Callable[[str, float], None],
+) -> None:
+    """Benchmark rendering the state and attributes of the menu sensor."""
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+    coordinator.data = NutrisliceMenu.from_weeks(_window(items_per_day))
+    entry = MagicMock()
+    entry.data = {
+        "district": "my-district",
+        "school_name": "elementary-school",
+        "meal_type": "lunch",
+        "categories": ["entree", "sides"],
+    }
+    entry.options = {"compact_attributes": compact}
+    sensor = NutrisliceSensor(coordinator, entry)
+
+    def render() -> None:
+        assert sensor.native_value
+        assert sensor.extra_state_attributes
+
+    name = "render_compact" if compact else "render"
+    now = SCHOOL_DAY.replace(tzinfo=dt_util.get_default_time_zone())
+    with patch.object(dt_util, "now", return_value=now):
+        check_benchmark(f"{name}[{items_per_day}]", _best_time(render))
+
+
+@pytest.mark.parametrize("items_per_day", SCALES)
+@pytest.mark.asyncio
+async def test_refresh(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    items_per_day: int,
+    check_benchmark: Callable[[str, float], None],
+) -> None:
+    """Benchmark a full refresh of the coordinator over the mocked API."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json=window_payloads(dt_util.now().date(), items_per_day=items_per_day)[
+            "current_week"
+        ],
+    )
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+
+    best = float("inf")
+    for _ in range(ROUNDS):
+        # Do not answer from the results shared between entries
+        coordinator._registry._results.clear()
+        started = time.perf_counter()
+        await coordinator._async_update_data()
+        best = min(best, time.perf_counter() - started)
+
+    check_benchmark(f"refresh[{items_per_day}]", best)
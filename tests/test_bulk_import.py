@@ -0,0 +1,176 @@
+"""Test the bulk import of Nutrislice menus."""
+
+import re
+from pathlib import Path
+from unittest.mock import ANY
+
+import pytest
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import ServiceValidationError, Unauthorized
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry, MockUser
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.const import DOMAIN
+
+
+@pytest.fixture(autouse=True)
+def schools(aioclient_mock: AiohttpClientMocker) -> None:
+    """Serve the schools of my-district, other districts are unknown."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/menu/api/schools/.*"),
+        json=[
+            {"slug": "north", "active_menu_types": [{"slug": "lunch"}]},
+            {"slug": "south"},
+        ],
+    )
+    aioclient_mock.get(re.compile(r".*/menu/api/schools/.*"), status=404)
+
+
+@pytest.mark.asyncio
+async def test_import_menus(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, mock_setup_entry
+) -> None:
+    """Test menus are deduplicated, validated once per district and created."""
+    MockConfigEntry(domain=DOMAIN, unique_id="my-district_south_lunch").add_to_hass(
+        hass
+    )
+    assert await async_setup_component(hass, DOMAIN, {})
+    menus = [
+        {"district": "my-district", "school_name": "north"},
+        {"district": "My-District", "school_name": "north", "meal_type": "lunch"},
+        {
+            "district": "my-district",
+            "school_name": " South ",
+            "meal_type": "breakfast",
+            "categories": "entree, sides",
+        },
+        {"district": "my-district", "school_name": "south"},
+        {"district": "my-district", "school_name": "north", "meal_type": "breakfast"},
+        {"district": "my-district", "school_name": "west"},
+        {"district": "other-district", "school_name": "north"},
+        {"district": "my-district", "school_name": "north", "meal_type": "dinner"},
+    ]
+
+    response = await hass.services.async_call(
+        DOMAIN, "import_menus", {"menus": menus}, blocking=True, return_response=True
+    )
+    await hass.async_block_till_done()
+
+    assert response["created"] == [
+        "my-district_north_lunch",
+        "my-district_south_breakfast",
+    ]
+    assert response["skipped"] == ["my-district_north_lunch", "my-district_south_lunch"]
+    invalid = response["invalid"]
+    assert [(menu["index"], menu["error"]) for menu in invalid[:3]] == [
+        (4, "Meal type not served by the school"),
+        (5, "Unknown school"),
+        (6, "Unknown district"),
+    ]
+    assert invalid[3]["index"] == 7
+    assert "meal_type" in invalid[3]["error"]
+    assert invalid[3]["menu"] == menus[7]
+    # One request per district
+    assert aioclient_mock.call_count == 2
+
+    entry = hass.config_entries.async_entry_for_domain_unique_id(
+        DOMAIN, "my-district_south_breakfast"
+    )
+    assert entry.title == "Nutrislice: South - Breakfast"
+    assert entry.data == {
+        "district": "my-district",
+        "school_name": "south",
+        "meal_type": "breakfast",
+        "categories": ["entree", "sides"],
+    }
+    # Along with the entry configured before
+    assert len(mock_setup_entry.mock_calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_import_menus_from_csv(
+    hass: HomeAssistant, tmp_path: Path, mock_setup_entry
+) -> None:
+    """Test menus are read from a CSV file in the config dir."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / "menus.csv").write_text(
+        "district,school_name,meal_type,categories\n"
+        'my-district,north,lunch,"entree,milk"\n'
+        "my-district,south,,\n"
+        "my-district,west,secret-value,\n"
+    )
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "import_menus",
+        {"filename": "menus.csv"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response["created"] == [
+        "my-district_north_lunch",
+        "my-district_south_lunch",
+    ]
+    # Rows of files are not echoed
+    assert response["invalid"] == [{"index": 2, "error": ANY}]
+    assert "secret-value" not in str(response)
+    entry = hass.config_entries.async_entry_for_domain_unique_id(
+        DOMAIN, "my-district_south_lunch"
+    )
+    assert entry.data["categories"] == ["entree"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "content",
+    [b"district,school_name\n\xffnorth,lunch\n", b'district\n"' + b"x" * 200_000],
+)
+async def test_import_malformed_csv(
+    hass: HomeAssistant, tmp_path: Path, content: bytes
+) -> None:
+    """Test a CSV file that cannot be parsed is reported."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / "menus.csv").write_bytes(content)
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with pytest.raises(ServiceValidationError, match="could not be parsed"):
+        await hass.services.async_call(
+            DOMAIN,
+            "import_menus",
+            {"filename": "menus.csv"},
+            blocking=True,
+            return_response=True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_import_menus_restrictions(
+    hass: HomeAssistant, tmp_path: Path, hass_read_only_user: MockUser
+) -> None:
+    """Test only admins import menus, and only from YAML or CSV files."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / "secrets.txt").write_text("district,school_name\n")
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with pytest.raises(ServiceValidationError, match="YAML or CSV"):
+        await hass.services.async_call(
+            DOMAIN,
+            "import_menus",
+            {"filename": "secrets.txt"},
+            blocking=True,
+            return_response=True,
+        )
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            "import_menus",
+            {"menus": []},
+            blocking=True,
+            return_response=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
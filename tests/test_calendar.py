@@ -0,0 +1,81 @@
+"""Test the Nutrislice calendar."""
+
+import re
+from datetime import timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.const import DOMAIN
+
+
+@pytest.mark.asyncio
+async def test_calendar_events(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test menu days are exposed as all-day events."""
+    freezer.move_to("2026-02-17 08:00:00")
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={
+            "days": [
+                {
+                    "date": "2026-02-16",
+                    "menu_items": [{"is_holiday": True, "text": "Presidents Day"}],
+                },
+                {
+                    "date": "2026-02-17",
+                    "menu_items": [
+                        {"food": {"name": "Pizza", "food_category": "entree"}}
+                    ],
+                },
+                {"date": "2026-02-21", "menu_items": []},
+            ]
+        },
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("calendar.elementary_school_lunch")
+    assert state.attributes["message"] == "Pizza"
+    assert state.attributes["all_day"] is True
+
+    calls = aioclient_mock.call_count
+    start = dt_util.now().replace(hour=0, minute=0)
+    response = await hass.services.async_call(
+        "calendar",
+        "get_events",
+        {
+            "start_date_time": start - timedelta(days=2),
+            "end_date_time": start + timedelta(days=7),
+        },
+        target={"entity_id": "calendar.elementary_school_lunch"},
+        blocking=True,
+        return_response=True,
+    )
+
+    events = response["calendar.elementary_school_lunch"]["events"]
+    assert [(event["start"], event["summary"]) for event in events] == [
+        ("2026-02-16", "Presidents Day"),
+        ("2026-02-17", "Pizza"),
+    ]
+    assert events[1]["description"] == "Pizza (entree)"
+    # Every week of the range is in the refresh window
+    assert aioclient_mock.call_count == calls
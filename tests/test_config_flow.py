@@ -1,10 +1,15 @@
 """Test the Nutrislice config flow."""
 
+import re
 from unittest.mock import patch
 
 import pytest
 from homeassistant import config_entries, data_entry_flow
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
 
 from custom_components.nutrislice.const import (
     CONF_DISTRICT,
@@ -119,3 +124,133 @@ async def test_form_cannot_connect(hass: HomeAssistant) -> None:
 
     assert result2["type"] == data_entry_flow.FlowResultType.FORM
     assert result2["errors"] == {"base": "cannot_connect"}
+
+
+@pytest.mark.asyncio
+async def test_options_flow(hass: HomeAssistant) -> None:
+    """Test the compact attributes option."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_DISTRICT: "my-district",
+            CONF_SCHOOL_NAME: "elementary-school",
+            CONF_MEAL_TYPE: "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with patch("custom_components.nutrislice.async_setup_entry", return_value=True):
+        result = await hass.config_entries.options.async_init(entry.entry_id)
+        assert result["type"] == data_entry_flow.FlowResultType.FORM
+        assert result["step_id"] == "init"
+
+        result2 = await hass.config_entries.options.async_configure(
+            result["flow_id"], {"compact_attributes": True}
+        )
+
+    assert result2["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert entry.options == {
+        "compact_attributes": True,
+        "category_count_sensors": False,
+        "diagnostic_sensors": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_discovery(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, mock_setup_entry
+) -> None:
+    """Test the menus of a district are discovered and created in bulk."""
+    base = r"https://my-district\.api\.nutrislice\.com/menu/api"
+    aioclient_mock.get(
+        re.compile(rf"{base}/schools/.*"),
+        json=[
+            {"slug": "north", "name": "North Elementary"},
+            {"slug": "south", "name": "South Middle"},
+            {"name": "No slug"},
+        ],
+    )
+    week = {"days": [{"date": "2025-01-06", "menu_items": []}]}
+    aioclient_mock.get(
+        re.compile(rf"{base}/weeks/school/north/menu-type/lunch/.*"), json=week
+    )
+    aioclient_mock.get(
+        re.compile(rf"{base}/weeks/school/north/menu-type/breakfast/.*"), status=404
+    )
+    aioclient_mock.get(re.compile(rf"{base}/weeks/school/south/.*"), json=week)
+    MockConfigEntry(domain=DOMAIN, unique_id="my-district_south_lunch").add_to_hass(
+        hass
+    )
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_DISTRICT: "My-District ", CONF_MEAL_TYPE: "lunch"}
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["step_id"] == "discover"
+    # The school list and every meal type of every school
+    assert aioclient_mock.call_count == 5
+    menus = result["data_schema"].schema["menus"].options
+    assert menus == {
+        "north/lunch": "North Elementary - Lunch",
+        "south/breakfast": "South Middle - Breakfast",
+    }
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"menus": []}
+    )
+    assert result["errors"] == {"base": "no_selection"}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"menus": list(menus)}
+    )
+    assert result["step_id"] == "categories"
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"categories": ["entree"]}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] == data_entry_flow.FlowResultType.CREATE_ENTRY
+    assert result["title"] == "Nutrislice: North - Lunch"
+    assert sorted(
+        entry.unique_id for entry in hass.config_entries.async_entries(DOMAIN)
+    ) == [
+        "my-district_north_lunch",
+        "my-district_south_breakfast",
+        "my-district_south_lunch",
+    ]
+    imported = hass.config_entries.async_entry_for_domain_unique_id(
+        DOMAIN, "my-district_south_breakfast"
+    )
+    assert imported.data == {
+        CONF_DISTRICT: "my-district",
+        CONF_SCHOOL_NAME: "south",
+        CONF_MEAL_TYPE: "breakfast",
+        "categories": ["entree"],
+    }
+    # Along with the entry configured before
+    assert len(mock_setup_entry.mock_calls) == 3
+    # Discovery is not repeated
+    assert aioclient_mock.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_discovery_no_menus(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test districts without schools or menus are reported."""
+    aioclient_mock.get(re.compile(r".*/schools/.*"), json=[{"slug": "north"}])
+    aioclient_mock.get(re.compile(r".*/weeks/.*"), status=404)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_DISTRICT: "my-district", CONF_SCHOOL_NAME: ""}
+    )
+
+    assert result["type"] == data_entry_flow.FlowResultType.FORM
+    assert result["errors"] == {"base": "no_menus"}
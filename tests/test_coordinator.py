@@ -0,0 +1,310 @@
+"""Test the Nutrislice data update coordinator."""
+
+import asyncio
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_capture_events
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.api import NutrisliceApiError, week_start, week_url
+from custom_components.nutrislice.const import EVENT_MENU_CHANGED, FETCH_CACHE_TTL
+from custom_components.nutrislice.coordinator import NutrisliceDataUpdateCoordinator
+from custom_components.nutrislice.model import DayMenu, NutrisliceMenu, WeekMenu
+
+WEEK_URL = re.compile(
+    r"https://my-district\.api\.nutrislice\.com/menu/api/weeks/school/"
+    r"elementary-school/menu-type/lunch/.*"
+)
+
+
+@pytest.mark.asyncio
+async def test_fetches_all_weeks(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test the three weeks are fetched over the shared session."""
+    aioclient_mock.get(WEEK_URL, json={"days": [{"date": "2026-02-17"}]})
+
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+    data = await coordinator._async_update_data()
+
+    assert aioclient_mock.call_count == 3
+    for key in ("previous_week", "current_week", "next_week"):
+        assert data.weeks[key] == WeekMenu(days=(DayMenu(date="2026-02-17"),))
+
+
+@pytest.mark.asyncio
+async def test_missing_current_week_is_fatal(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a missing current week fails the update."""
+    aioclient_mock.get(WEEK_URL, status=404)
+
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+    with pytest.raises(UpdateFailed, match="current week: 404"):
+        await coordinator._async_update_data()
+
+
+@pytest.mark.asyncio
+async def test_optional_weeks_are_ignored(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test errors on the previous and next week are not fatal."""
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+
+    def url(day: datetime) -> str:
+        return week_url("my-district", "elementary-school", "lunch", day.date())
+
+    today = dt_util.now()
+    aioclient_mock.get(url(today - timedelta(days=7)), exc=TimeoutError)
+    aioclient_mock.get(url(today), json={"days": []})
+    aioclient_mock.get(url(today + timedelta(days=7)), status=404)
+
+    data = await coordinator._async_update_data()
+
+    assert data.weeks == {
+        "previous_week": None,
+        "current_week": WeekMenu(days=()),
+        "next_week": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_requests_are_shared_between_entries(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test entries asking for the same weeks share one request per URL."""
+    aioclient_mock.get(WEEK_URL, json={"days": []})
+
+    coordinators = [
+        NutrisliceDataUpdateCoordinator(
+            hass,
+            district="my-district",
+            school_name="elementary-school",
+            meal_type="lunch",
+        )
+        for _ in range(3)
+    ]
+    # In flight requests are merged...
+    await asyncio.gather(*(c._async_update_data() for c in coordinators))
+    assert aioclient_mock.call_count == 3
+
+    # ...and results are reused for a short time.
+    await coordinators[0]._async_update_data()
+    assert aioclient_mock.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_weeks_outside_window(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test server errors on lazy weeks raise and unpublished weeks expire."""
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+    start = week_start(dt_util.now().date() + timedelta(days=28))
+    url = week_url("my-district", "elementary-school", "lunch", start)
+
+    aioclient_mock.get(url, status=500)
+    with pytest.raises(NutrisliceApiError):
+        await coordinator.async_get_week_menu(start)
+    assert not coordinator._extra_weeks
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(url, status=404)
+    freezer.tick(FETCH_CACHE_TTL)
+    assert not (await coordinator.async_get_week_menu(start)).days
+    await coordinator.async_get_week_menu(start)
+    assert aioclient_mock.call_count == 1
+
+    # Published meanwhile
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(url, json={"days": [{"date": start.isoformat()}]})
+    freezer.tick(FETCH_CACHE_TTL)
+    assert (await coordinator.async_get_week_menu(start)).days
+    assert aioclient_mock.call_count == 1
+
+
+def _menu(*, next_week: bool = True, item: str = "Pizza") -> NutrisliceMenu:
+    """Return a menu with a school day in the current week."""
+    week = {
+        "days": [
+            {
+                "date": "2026-02-18",
+                "menu_items": [{"food": {"name": item, "food_category": "entree"}}],
+            }
+        ]
+    }
+    return NutrisliceMenu.from_weeks(
+        {"current_week": week, "next_week": {"days": []} if next_week else None}
+    )
+
+
+@pytest.mark.asyncio
+async def test_adaptive_update_interval(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test the refresh interval follows the menu."""
+    freezer.move_to("2026-02-17 08:00:00")
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+
+    # Next week not published yet
+    assert coordinator._next_update_interval(_menu(next_week=False)) == timedelta(
+        hours=2
+    )
+
+    # Stable menu backs off
+    coordinator.data = _menu()
+    intervals = []
+    for _ in range(5):
+        intervals.append(coordinator._next_update_interval(_menu()))
+    assert intervals == [timedelta(hours=h) for h in (6, 12, 24, 48, 48)]
+
+    # A change polls again soon
+    assert coordinator._next_update_interval(_menu(item="Tacos")) == timedelta(hours=2)
+
+    # On break
+    coordinator.data = None
+    empty = NutrisliceMenu.from_weeks({"current_week": {"days": []}})
+    assert coordinator._next_update_interval(empty) == timedelta(hours=48)
+
+
+@pytest.mark.asyncio
+async def test_update_interval_stops_at_week_start(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test the next refresh never skips the start of a week."""
+    freezer.move_to("2026-02-21 20:00:00-08:00")
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+
+    empty = NutrisliceMenu.from_weeks({"current_week": {"days": []}})
+    assert coordinator._next_update_interval(empty) == timedelta(hours=4, minutes=5)
+
+
+@pytest.mark.asyncio
+async def test_menu_changed_events(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a changed menu fires the changes of each changed day."""
+    events = async_capture_events(hass, EVENT_MENU_CHANGED)
+    aioclient_mock.get(
+        WEEK_URL,
+        json={
+            "days": [
+                {
+                    "date": "2026-02-18",
+                    "menu_items": [{"food": {"name": "Tacos"}}],
+                },
+                {
+                    "date": "2026-02-19",
+                    "menu_items": [{"is_holiday": True, "text": "Snow Day"}],
+                },
+            ]
+        },
+    )
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+    coordinator.data = NutrisliceMenu.from_weeks(
+        {
+            "current_week": {
+                "days": [
+                    {
+                        "date": "2026-02-18",
+                        "menu_items": [{"food": {"name": "Pizza"}}],
+                    },
+                    {"date": "2026-02-19"},
+                ]
+            }
+        }
+    )
+
+    await coordinator._async_update_data()
+    await hass.async_block_till_done()
+
+    assert coordinator.menu_changed
+    assert [event.data for event in events] == [
+        {
+            "entry_id": None,
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+            "date": "2026-02-18",
+            "added": ["Tacos"],
+            "removed": ["Pizza"],
+            "holiday_changed": False,
+            "is_holiday": False,
+            "holiday_name": None,
+        },
+        {
+            "entry_id": None,
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+            "date": "2026-02-19",
+            "added": [],
+            "removed": [],
+            "holiday_changed": True,
+            "is_holiday": True,
+            "holiday_name": "Snow Day",
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_serves_stale_menu(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test the last good menu is kept and marked stale when refreshes fail."""
+    aioclient_mock.get(WEEK_URL, status=500)
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+
+    coordinator.data = menu = _menu()
+    assert await coordinator._async_update_data() is menu
+    assert coordinator.stale
+    # On the same clock as the last success in diagnostics
+    assert coordinator.stale_since.tzinfo is dt_util.UTC
+    assert timedelta(hours=2) <= coordinator.update_interval < timedelta(hours=2.5)
+
+
+@pytest.mark.asyncio
+async def test_refreshes_are_staggered(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test entries refresh at their own, stable offset within a slot."""
+    freezer.move_to("2026-02-17 08:00:00")
+
+    def refresh_time(school_name: str) -> datetime:
+        coordinator = NutrisliceDataUpdateCoordinator(
+            hass, district="my-district", school_name=school_name, meal_type="lunch"
+        )
+        interval = coordinator._staggered(timedelta(hours=6))
+        assert timedelta(hours=6) <= interval < timedelta(hours=6, minutes=30)
+        return dt_util.now() + interval
+
+    times = {refresh_time(f"school-{number}") for number in range(20)}
+    assert len(times) == 20
+    assert refresh_time("school-0") in times
@@ -0,0 +1,87 @@
+"""Test the Nutrislice diagnostics."""
+
+import re
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.components.diagnostics import (
+    get_diagnostics_for_config_entry,
+)
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.const import DOMAIN
+
+
+@pytest.mark.asyncio
+async def test_entry_diagnostics(
+    hass: HomeAssistant, hass_client, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test the diagnostics report the cost of the refreshes."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={"days": [{"date": "2026-02-17", "menu_items": []}]},
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+        options={"diagnostic_sensors": True},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await get_diagnostics_for_config_entry(hass, hass_client, entry)
+
+    coordinator = diagnostics["coordinator"]
+    assert coordinator["last_success"] is not None
+    assert coordinator["refresh_duration"] > 0
+    assert coordinator["parse_duration"] > 0
+    assert coordinator["state_size"] > 0
+    assert not coordinator["breaker_open"]
+    current_week = coordinator["weeks"]["current_week"]
+    assert current_week["requests"] == 1
+    assert current_week["payload_bytes"] > 0
+    assert current_week["latency"] is not None
+
+    # The diagnostic sensors are fed by the same stats
+    state = hass.states.get("sensor.elementary_school_lunch_requests")
+    assert state.state == "3"
+    assert state.attributes["errors"] == 0
+    assert hass.states.get("sensor.elementary_school_lunch_payload_size").state != "0"
+    assert hass.states.get("sensor.elementary_school_lunch_last_refresh").state
+
+
+@pytest.mark.asyncio
+async def test_state_size_without_diagnostic_sensors(
+    hass: HomeAssistant, hass_client, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test the state size is reported for entries without diagnostic sensors."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={"days": [{"date": "2026-02-17", "menu_items": []}]},
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await get_diagnostics_for_config_entry(hass, hass_client, entry)
+
+    state = hass.states.get("sensor.elementary_school_lunch")
+    assert diagnostics["coordinator"]["state_size"] == len(state.as_dict_json)
+    # Not measured on every state write
+    assert hass.data[DOMAIN][entry.entry_id].stats.state_size is None
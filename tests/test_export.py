@@ -0,0 +1,207 @@
+"""Test the Nutrislice export service."""
+
+import csv
+import json
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import (
+    HomeAssistantError,
+    ServiceValidationError,
+    Unauthorized,
+)
+from pytest_homeassistant_custom_component.common import MockConfigEntry, MockUser
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.api import get_fetch_registry, week_url
+from custom_components.nutrislice.const import DOMAIN
+
+WEEK = {
+    "days": [
+        {
+            "date": "2025-01-06",
+            "menu_items": [
+                {"food": {"name": "Pizza", "food_category": "entree"}},
+                {"food": {"name": "Apple", "food_category": "fruit"}},
+            ],
+        },
+        {"date": "2025-01-07", "menu_items": [{"is_holiday": True, "text": "Snow"}]},
+        {"date": "2025-01-08", "menu_items": []},
+    ]
+}
+
+
+@pytest.fixture
+async def entry(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, tmp_path: Path
+) -> MockConfigEntry:
+    """Set up an entry whose API returns the same week for every date."""
+    hass.config.config_dir = str(tmp_path)
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"), json=WEEK
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_export_jsonl(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    entry: MockConfigEntry,
+    tmp_path: Path,
+) -> None:
+    """Test weeks outside the window are fetched once each and streamed."""
+    calls = aioclient_mock.call_count
+
+    # Six weeks, each answered with the same days of January
+    response = await hass.services.async_call(
+        DOMAIN,
+        "export",
+        {
+            "config_entry_id": entry.entry_id,
+            "start_date": date(2025, 1, 5),
+            "end_date": date(2025, 1, 5) + timedelta(weeks=6, days=-1),
+            "filename": "exports/lunch.jsonl",
+        },
+        blocking=True,
+        return_response=True,
+    )
+
+    assert aioclient_mock.call_count == calls + 6
+    exports = tmp_path / "nutrislice_exports" / "exports"
+    lines = (exports / "lunch.jsonl").read_text().splitlines()
+    # Only the days of the first week fall within their own week
+    assert len(lines) == 3
+    assert response == {"path": str(exports / "lunch.jsonl"), "records": 3}
+    day = json.loads(lines[0])
+    assert day["entry_id"] == entry.entry_id
+    assert day["school_name"] == "elementary-school"
+    assert day["menu_summary"] == "Pizza, Apple"
+    assert list(exports.iterdir()) == [exports / "lunch.jsonl"]
+
+    # Exported weeks are not kept in memory or storage
+    registry = get_fetch_registry(hass)
+    url = week_url("my-district", "elementary-school", "lunch", date(2025, 1, 5))
+    assert url not in registry._results
+    assert url not in registry._weeks
+    assert not hass.data[DOMAIN][entry.entry_id]._extra_weeks
+
+
+@pytest.mark.asyncio
+async def test_export_fails_on_server_errors(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    entry: MockConfigEntry,
+    tmp_path: Path,
+) -> None:
+    """Test a week the API fails to return fails the export."""
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(
+        week_url("my-district", "elementary-school", "lunch", date(2025, 1, 12)),
+        status=503,
+    )
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"), json=WEEK
+    )
+
+    with pytest.raises(HomeAssistantError, match="status 503"):
+        await hass.services.async_call(
+            DOMAIN,
+            "export",
+            {
+                "config_entry_id": entry.entry_id,
+                "start_date": date(2025, 1, 5),
+                "end_date": date(2025, 1, 25),
+                "filename": "lunch.jsonl",
+            },
+            blocking=True,
+        )
+
+    assert not list((tmp_path / "nutrislice_exports").iterdir())
+
+
+@pytest.mark.asyncio
+async def test_export_csv(
+    hass: HomeAssistant, entry: MockConfigEntry, tmp_path: Path
+) -> None:
+    """Test CSV has a row per item and per holiday."""
+    await hass.services.async_call(
+        DOMAIN,
+        "export",
+        {
+            "config_entry_id": [entry.entry_id],
+            "start_date": date(2025, 1, 5),
+            "end_date": date(2025, 1, 11),
+            "filename": "lunch.csv",
+            "format": "csv",
+        },
+        blocking=True,
+    )
+
+    with (tmp_path / "nutrislice_exports" / "lunch.csv").open(newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["date"], row["name"], row["holiday_name"]) for row in rows] == [
+        ("2025-01-06", "Pizza", ""),
+        ("2025-01-06", "Apple", ""),
+        ("2025-01-07", "", "Snow"),
+    ]
+    assert rows[1]["position"] == "1"
+    assert rows[1]["category"] == "fruit"
+
+
+@pytest.mark.asyncio
+async def test_export_errors(
+    hass: HomeAssistant,
+    entry: MockConfigEntry,
+    hass_read_only_user: MockUser,
+    tmp_path: Path,
+) -> None:
+    """Test unknown entries, invalid ranges, paths and users are rejected."""
+    (tmp_path / "configuration.yaml").write_text("default_config:\n")
+    data = {
+        "config_entry_id": entry.entry_id,
+        "start_date": date(2025, 1, 5),
+        "end_date": date(2025, 1, 11),
+        "filename": "lunch.jsonl",
+    }
+    for invalid in (
+        {"config_entry_id": "unknown"},
+        {"end_date": date(2025, 1, 4)},
+        {"end_date": date(2026, 1, 10)},
+        {"filename": "../lunch.jsonl"},
+        {"filename": "/tmp/lunch.jsonl"},
+        {"filename": "../configuration.yaml"},
+        {"filename": str(tmp_path / "configuration.yaml")},
+        {"filename": "configuration.yaml"},
+        {"filename": "lunch.csv"},
+    ):
+        with pytest.raises(ServiceValidationError):
+            await hass.services.async_call(
+                DOMAIN, "export", {**data, **invalid}, blocking=True
+            )
+    assert (tmp_path / "configuration.yaml").read_text() == "default_config:\n"
+
+    with pytest.raises(Unauthorized):
+        await hass.services.async_call(
+            DOMAIN,
+            "export",
+            data,
+            blocking=True,
+            context=Context(user_id=hass_read_only_user.id),
+        )
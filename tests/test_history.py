@@ -0,0 +1,198 @@
+"""Test the Nutrislice menu history archive."""
+
+import re
+from contextlib import closing
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.const import DOMAIN
+from custom_components.nutrislice.history import MenuHistory, _where, get_menu_history
+from custom_components.nutrislice.model import FoodCatalog, WeekMenu
+
+from .payloads import window_payloads
+
+WEEK = {
+    "days": [
+        {
+            "date": "2025-03-03",
+            "menu_items": [
+                {"food": {"id": 1, "name": "Pizza", "food_category": "entree"}},
+                {"food": {"id": 2, "name": "Apple", "food_category": "fruit"}},
+            ],
+        },
+        {
+            "date": "2025-03-04",
+            "menu_items": [
+                {
+                    "food": {
+                        "id": 3,
+                        "name": "Pepperoni pizza",
+                        "food_category": "entree",
+                    }
+                }
+            ],
+        },
+        {"date": "2025-03-05", "menu_items": [{"is_holiday": True, "text": "Snow"}]},
+    ]
+}
+
+
+@pytest.mark.asyncio
+async def test_archive_and_query(hass: HomeAssistant) -> None:
+    """Test days are archived per version and queried by date and food."""
+    history = get_menu_history(hass)
+    days = WeekMenu.from_payload(WEEK, FoodCatalog()).days
+    await history.async_archive("lunch", days)
+    await history.async_archive("lunch", days)
+    await history.async_archive("breakfast", days[:1])
+
+    result = await history.async_query(food="PIZ")
+    assert [(day["entry_id"], day["date"]) for day in result["days"]] == [
+        ("breakfast", "2025-03-03"),
+        ("lunch", "2025-03-03"),
+    ]
+    assert result["days"][1]["menu_items"] == [{"name": "Pizza", "category": "entree"}]
+    assert result["foods"] == [
+        {
+            "name": "Pizza",
+            "category": "entree",
+            "count": 2,
+            "first_served": "2025-03-03",
+            "last_served": "2025-03-03",
+        }
+    ]
+    result = await history.async_query(food="pepperoni", category="Entree")
+    assert [food["name"] for food in result["foods"]] == ["Pepperoni pizza"]
+    # Wildcards are matched literally
+    for food in ("%pizza", "_izza"):
+        assert not (await history.async_query(food=food))["days"]
+
+    result = await history.async_query("lunch", "2025-03-04", "2025-03-31")
+    assert [day["date"] for day in result["days"]] == ["2025-03-04", "2025-03-05"]
+    assert result["days"][1]["is_holiday"]
+    assert result["days"][1]["holiday_name"] == "Snow"
+
+    # Only the first days are returned, counting the ones matching the filters
+    result = await history.async_query(limit=2)
+    assert [(day["entry_id"], day["date"]) for day in result["days"]] == [
+        ("breakfast", "2025-03-03"),
+        ("lunch", "2025-03-03"),
+    ]
+    assert [len(day["menu_items"]) for day in result["days"]] == [2, 2]
+    result = await history.async_query(food="pepperoni", limit=1)
+    assert [day["date"] for day in result["days"]] == ["2025-03-04"]
+
+    # A new version of a day replaces the archived one
+    changed = WeekMenu.from_payload(
+        {"days": [{"date": "2025-03-03", "menu_items": [{"food": {"name": "Tacos"}}]}]},
+        FoodCatalog(),
+    ).days
+    await history.async_archive("lunch", changed)
+    result = await history.async_query("lunch", "2025-03-03", "2025-03-03")
+    assert result["days"][0]["menu_items"] == [{"name": "Tacos", "category": "other"}]
+
+    await history.async_remove_entry("lunch")
+    assert [day["entry_id"] for day in (await history.async_query())["days"]] == [
+        "breakfast"
+    ]
+
+
+def test_schema_created_once(tmp_path: Path) -> None:
+    """Test the tables are only created by the first connection."""
+    history = MenuHistory(MagicMock(), str(tmp_path / "h.db"))
+    with closing(history._connect()) as db:
+        db.execute("DROP INDEX items_category")
+    with closing(history._connect()) as db:
+        assert not db.execute(
+            "SELECT * FROM sqlite_master WHERE name = 'items_category'"
+        ).fetchall()
+
+
+@pytest.mark.parametrize(
+    ("food", "category", "index"),
+    [("piz", None, "items_food"), (None, "entree", "items_category")],
+)
+def test_queries_use_indexes(
+    tmp_path: Path, food: str | None, category: str | None, index: str
+) -> None:
+    """Test food and category lookups search an index instead of the table."""
+    where, params = _where(None, None, None, food, category)
+    with closing(MenuHistory(MagicMock(), str(tmp_path / "h.db"))._connect()) as db:
+        plan = db.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM items {where}", params
+        ).fetchall()
+    assert f"SEARCH items USING INDEX {index}" in plan[0]["detail"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_archives_past_days(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    hass_ws_client,
+) -> None:
+    """Test refreshes archive the past days, served by the service and WebSocket."""
+    today = dt_util.now().date()
+    for week in window_payloads(today, items_per_day=3).values():
+        aioclient_mock.get(
+            re.compile(
+                r"https://my-district\.api\.nutrislice\.com/.*/"
+                + week["start_date"].replace("-", "/")
+                + "/.*"
+            ),
+            json=week,
+        )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_history",
+        {"config_entry_id": entry.entry_id},
+        blocking=True,
+        return_response=True,
+    )
+    # The school days of last week and of this week before today
+    last_sunday = today - timedelta(days=(today.weekday() + 1) % 7 + 7)
+    dates = [
+        day.isoformat()
+        for day in (last_sunday + timedelta(days=days) for days in range(14))
+        if day.weekday() < 5 and day < today
+    ]
+    assert [day["date"] for day in response["days"]] == dates
+    assert all(len(day["menu_items"]) == 3 for day in response["days"])
+    assert sum(food["count"] for food in response["foods"]) == len(dates) * 3
+
+    client = await hass_ws_client(hass)
+    await client.send_json(
+        {"id": 1, "type": "nutrislice/history", "start_date": dates[-1]}
+    )
+    msg = await client.receive_json()
+    assert msg["success"]
+    assert [day["date"] for day in msg["result"]["days"]] == [dates[-1]]
+    await client.send_json({"id": 2, "type": "nutrislice/history", "limit": 2})
+    msg = await client.receive_json()
+    assert [day["date"] for day in msg["result"]["days"]] == dates[:2]
+    await client.send_json({"id": 3, "type": "nutrislice/history", "limit": 0})
+    assert not (await client.receive_json())["success"]
+
+    await hass.config_entries.async_remove(entry.entry_id)
+    await hass.async_block_till_done()
+    assert (await get_menu_history(hass).async_query())["days"] == []
@@ -0,0 +1,78 @@
+"""Test the Nutrislice integration setup."""
+
+import re
+from typing import Any
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.api import week_start, week_url
+from custom_components.nutrislice.const import (
+    CONF_CATEGORIES,
+    CONF_DISTRICT,
+    CONF_MEAL_TYPE,
+    CONF_SCHOOL_NAME,
+    DOMAIN,
+    STORAGE_KEY_WEEKS,
+)
+
+WEEK_URL = re.compile(r"https://my-district\.api\.nutrislice\.com/.*")
+
+ENTRY_DATA = {
+    CONF_DISTRICT: "my-district",
+    CONF_SCHOOL_NAME: "elementary-school",
+    CONF_MEAL_TYPE: "lunch",
+    CONF_CATEGORIES: ["entree"],
+}
+
+
+@pytest.mark.asyncio
+async def test_setup_from_stored_menu(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """Test setup does not wait on the API when a stored menu is available."""
+    today = dt_util.now().date()
+    hass_storage[STORAGE_KEY_WEEKS] = {
+        "version": 1,
+        "key": STORAGE_KEY_WEEKS,
+        "data": {
+            "weeks": {
+                week_url("my-district", "elementary-school", "lunch", today): {
+                    "week_start": week_start(today).isoformat(),
+                    "data": {"days": [{"date": today.isoformat()}]},
+                }
+            }
+        },
+    }
+    aioclient_mock.get(WEEK_URL, status=500)
+
+    entry = MockConfigEntry(domain=DOMAIN, data=ENTRY_DATA)
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.LOADED
+    assert hass.states.get("sensor.elementary_school_lunch") is not None
+
+
+@pytest.mark.asyncio
+async def test_setup_without_stored_menu(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test setup is retried when there is no stored menu and the API fails."""
+    aioclient_mock.get(WEEK_URL, status=500)
+
+    entry = MockConfigEntry(domain=DOMAIN, data=ENTRY_DATA)
+    entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
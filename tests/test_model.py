@@ -0,0 +1,192 @@
+"""Test the Nutrislice menu model."""
+
+import gc
+import json
+import tracemalloc
+from typing import Any
+
+from custom_components.nutrislice.model import (
+    CategoryClassifier,
+    FoodCatalog,
+    NutrisliceMenu,
+    project_week,
+)
+
+
+def _raw_week(items_per_day: int = 15) -> dict[str, Any]:
+    """Return a week shaped like the API's, with full food objects."""
+    nutrition = dict.fromkeys(
+        (
+            "calories",
+            "g_fat",
+            "g_saturated_fat",
+            "g_trans_fat",
+            "mg_cholesterol",
+            "g_carbs",
+            "g_added_sugar",
+            "g_sugar",
+            "mg_potassium",
+            "mg_sodium",
+            "g_fiber",
+            "g_protein",
+            "mg_iron",
+            "mg_calcium",
+            "mg_vitamin_c",
+            "iu_vitamin_a",
+        ),
+        12.5,
+    )
+    return {
+        "start_date": "2026-02-15",
+        "menu_type_id": 1234,
+        "days": [
+            {
+                "date": f"2026-02-{16 + day}",
+                "has_unpublished_menus": False,
+                "menu_info": {"1234": {"section_options": {"display_name": ""}}},
+                "menu_items": [
+                    {
+                        "id": day * 100 + item,
+                        "date": f"2026-02-{16 + day}",
+                        "position": item,
+                        "is_section_title": False,
+                        "is_holiday": False,
+                        "text": "",
+                        "category": "entree" if item % 3 == 0 else "",
+                        "food": {
+                            "id": 5000 + item,
+                            "name": f"Food number {item}",
+                            "description": "A long description of the food " * 4,
+                            "subtext": "",
+                            "image_url": f"https://images.example.com/{item}.jpg",
+                            "hoverpic": f"https://images.example.com/{item}-hover.jpg",
+                            "thumbnail_url": f"https://images.example.com/{item}-t.jpg",
+                            "food_category": "sides",
+                            "rounded_nutrition_info": nutrition,
+                            "serving_size_info": {
+                                "serving_size_amount": "1",
+                                "serving_size_unit": "each",
+                            },
+                            "icons": {
+                                "food_icons": [
+                                    {"id": icon, "synced_name": "Vegetarian"}
+                                    for icon in range(3)
+                                ],
+                                "myplate_icons": [],
+                            },
+                            "ingredients": "Flour, water, salt, yeast, cheese",
+                        },
+                    }
+                    for item in range(items_per_day)
+                ],
+            }
+            for day in range(5)
+        ],
+    }
+
+
+def test_project_week_keeps_displayed_fields() -> None:
+    """Test projection keeps what the menu needs and parses the same."""
+    raw = _raw_week()
+    raw["days"][0]["menu_items"].insert(0, {"is_holiday": True, "text": "Snow Day"})
+    raw["days"][1]["menu_items"].insert(0, {"is_section_title": True, "text": "Hot"})
+
+    projected = project_week(raw)
+
+    assert projected["days"][0]["menu_items"][0] == {
+        "is_holiday": True,
+        "text": "Snow Day",
+    }
+    assert projected["days"][1]["menu_items"][0] == {
+        "category": "entree",
+        "food": {"id": 5000, "name": "Food number 0", "food_category": "sides"},
+    }
+    assert (
+        NutrisliceMenu.from_weeks({"current_week": projected}).parsed_days()
+        == NutrisliceMenu.from_weeks({"current_week": raw}).parsed_days()
+    )
+
+
+def test_projection_memory() -> None:
+    """Benchmark the memory held by a raw week against a projected one."""
+    payload = json.dumps(_raw_week())
+
+    tracemalloc.start()
+    try:
+        raw = json.loads(payload)
+        raw_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        tracemalloc.clear_traces()
+
+        projected = project_week(json.loads(payload))
+        projected_size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert raw["days"] and projected["days"]
+    # The projected week holds a fraction of the raw payload
+    assert projected_size * 3 < raw_size
+
+
+def test_menu_memory() -> None:
+    """Measure the payloads kept for entries of a district and their menus."""
+    payload = json.dumps(_raw_week())
+    catalog = FoodCatalog()
+
+    sizes = []
+    tracemalloc.start()
+    try:
+        for entries in (1, 10):
+            tracemalloc.clear_traces()
+            # Every entry has its own URL, so its own stored payload
+            weeks = [project_week(json.loads(payload)) for _ in range(entries)]
+            payload_size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.clear_traces()
+            menus = [
+                NutrisliceMenu.from_weeks({"current_week": week}, catalog)
+                for week in weeks
+            ]
+            sizes.append((payload_size, tracemalloc.get_traced_memory()[0]))
+            del weeks, menus
+    finally:
+        tracemalloc.stop()
+
+    (one_payload, _), (ten_payloads, ten_menus) = sizes
+    # Payloads grow with the entries, the catalog does not dedupe them...
+    assert ten_payloads > 5 * one_payload
+    # ...and outweigh the parsed menus, whose items are shared
+    assert ten_payloads > 4 * ten_menus
+
+
+def test_foods_are_shared_across_entries() -> None:
+    """Test menus of a district share one item per food."""
+    catalog = FoodCatalog()
+    week = project_week(_raw_week())
+    lunch = NutrisliceMenu.from_weeks({"current_week": week}, catalog)
+    breakfast = NutrisliceMenu.from_weeks({"current_week": week}, catalog)
+
+    monday = lunch.get_day("2026-02-16")
+    assert monday.items[0] is breakfast.get_day("2026-02-16").items[0]
+    assert monday.items[0] is lunch.get_day("2026-02-17").items[0]
+    # One item per food and category, whatever the number of days and entries
+    assert len(catalog) == 15
+
+    del lunch, breakfast, monday
+    gc.collect()
+    assert len(catalog) == 0
+
+
+def test_category_classifier() -> None:
+    """Test raw categories map to the known categories and their aliases."""
+    classifier = CategoryClassifier()
+
+    assert classifier.classify("Entrees") == {"entree"}
+    assert classifier.classify("fruit") == {"fruit", "sides"}
+    assert classifier.classify("grain") == {"grain", "sides"}
+    assert classifier.classify("") == frozenset()
+    assert classifier.classify("seasonal") == frozenset()
+    assert classifier.classify("Entrees") is classifier.classify("Entrees")
+
+    custom = CategoryClassifier(["entree", "milk"], {"milk": ["beverage"]})
+    assert custom.classify("beverages") == {"milk"}
+    assert custom.classify("fruit") == frozenset()
@@ -1,11 +1,23 @@
 """Test the Nutrislice sensor."""
 
-from unittest.mock import patch
+import re
+from unittest.mock import MagicMock, patch
 
 import pytest
+from freezegun.api import FrozenDateTimeFactory
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceNotSupported
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
 
+from custom_components.nutrislice.const import DOMAIN
 from custom_components.nutrislice.coordinator import NutrisliceDataUpdateCoordinator
+from custom_components.nutrislice.model import NutrisliceMenu
 from custom_components.nutrislice.sensor import NutrisliceSensor
 
 
@@ -62,8 +74,7 @@ async def test_sensor_state_and_attributes(hass: HomeAssistant) -> None:
         "next_week": None,
     }
 
-    coordinator.data = mock_data
-    from unittest.mock import MagicMock
+    coordinator.data = NutrisliceMenu.from_weeks(mock_data)
 
     mock_entry = MagicMock()
     mock_entry.data = {
@@ -72,6 +83,7 @@ async def test_sensor_state_and_attributes(hass: HomeAssistant) -> None:
         "meal_type": "lunch",
         "categories": ["entree", "sides"],
     }
+    mock_entry.options = {}
 
     sensor = NutrisliceSensor(coordinator, mock_entry)
 
@@ -100,9 +112,9 @@ async def test_sensor_state_and_attributes(hass: HomeAssistant) -> None:
     assert menu_day["menu_items"][0]["category"] == "entree"
 
     # 3. Test State (Depends on today's date, mock datetime)
-    with patch("custom_components.nutrislice.sensor.datetime") as mock_datetime:
+    with patch("custom_components.nutrislice.sensor.dt_util") as mock_dt_util:
         # Mock today as the holiday
-        mock_now = mock_datetime.now.return_value
+        mock_now = mock_dt_util.now.return_value
         mock_now.strftime.return_value = "2026-02-16"
         mock_now.hour = 10
         assert sensor.native_value == "Presidents Day"
@@ -113,10 +125,10 @@ async def test_sensor_state_and_attributes(hass: HomeAssistant) -> None:
         assert sensor.native_value == "2 Entrees Available"
 
     # 4. Test set_target_date service (Handle the timedelta logic)
-    with patch("custom_components.nutrislice.sensor.datetime") as mock_datetime:
+    with patch("custom_components.nutrislice.sensor.dt_util") as mock_dt_util:
         from datetime import datetime as dt
 
-        mock_now = mock_datetime.now.return_value
+        mock_now = mock_dt_util.now.return_value
         mock_now.strftime.side_effect = lambda fmt: (
             dt(2026, 2, 17) if fmt == "%Y-%m-%d" else dt(2026, 2, 17)
         ).strftime(fmt)
@@ -125,3 +137,265 @@ async def test_sensor_state_and_attributes(hass: HomeAssistant) -> None:
         # This SHOULD NO LONGER fail with UnboundLocalError
         attrs = sensor.extra_state_attributes
         assert attrs["target_date"] == "2026-02-17"
+
+
+@pytest.mark.asyncio
+async def test_compact_attributes(hass: HomeAssistant) -> None:
+    """Test compact attributes only keep the days the sensor is about."""
+    coordinator = NutrisliceDataUpdateCoordinator(
+        hass, district="my-district", school_name="elementary-school", meal_type="lunch"
+    )
+    coordinator.data = NutrisliceMenu.from_weeks(
+        {
+            "current_week": {
+                "days": [
+                    {"date": f"2026-02-{day}", "menu_items": []}
+                    for day in range(15, 22)
+                ]
+            }
+        }
+    )
+
+    mock_entry = MagicMock()
+    mock_entry.data = {
+        "district": "my-district",
+        "school_name": "elementary-school",
+        "meal_type": "lunch",
+    }
+    mock_entry.options = {"compact_attributes": True}
+    sensor = NutrisliceSensor(coordinator, mock_entry)
+
+    assert "days" in sensor._unrecorded_attributes
+
+    with patch("custom_components.nutrislice.sensor.dt_util") as mock_dt_util:
+        mock_now = mock_dt_util.now.return_value
+        mock_now.__add__.return_value.strftime.return_value = "2026-02-18"
+        mock_now.strftime.return_value = "2026-02-17"
+        mock_now.hour = 14
+
+        attrs = sensor.extra_state_attributes
+
+    assert attrs["target_date"] == "2026-02-18"
+    assert [day["date"] for day in attrs["days"]] == ["2026-02-17", "2026-02-18"]
+
+    # The whole window is still available on demand
+    response = await sensor.async_get_menu()
+    assert len(response["days"]) == 7
+
+
+@pytest.mark.asyncio
+async def test_get_menu_service(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test the get_menu service returns the parsed menu window."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={"days": [{"date": "2026-02-17", "menu_items": []}]},
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_menu",
+        target={"entity_id": "sensor.elementary_school_lunch"},
+        blocking=True,
+        return_response=True,
+    )
+
+    days = response["sensor.elementary_school_lunch"]["days"]
+    assert [day["date"] for day in days] == ["2026-02-17"]
+
+
+@pytest.mark.asyncio
+async def test_services_skip_diagnostic_sensors(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test the entity services only target the sensors showing a menu."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={"days": [{"date": "2026-02-17", "menu_items": []}]},
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+            "categories": ["entree"],
+        },
+        options={"diagnostic_sensors": True},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_menu",
+        target={"entity_id": "all"},
+        blocking=True,
+        return_response=True,
+    )
+    assert set(response) == {
+        "sensor.elementary_school_lunch",
+        "sensor.elementary_school_lunch_entree",
+    }
+
+    with pytest.raises(ServiceNotSupported):
+        await hass.services.async_call(
+            DOMAIN,
+            "set_date",
+            {"date": "2026-02-18"},
+            target={"entity_id": "sensor.elementary_school_lunch_requests"},
+            blocking=True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_rollover_without_refresh(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test the target date moves at the rollover hour from cached data."""
+    freezer.move_to("2026-02-17 12:59:00-08:00")
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={"days": [{"date": "2026-02-17", "menu_items": []}]},
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    calls = aioclient_mock.call_count
+
+    state = hass.states.get("sensor.elementary_school_lunch")
+    assert state.attributes["target_date"] == "2026-02-17"
+
+    freezer.move_to("2026-02-17 13:00:01-08:00")
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    state = hass.states.get("sensor.elementary_school_lunch")
+    assert state.attributes["target_date"] == "2026-02-18"
+    assert state.state == "unknown"
+    assert aioclient_mock.call_count == calls
+
+
+@pytest.mark.asyncio
+async def test_unchanged_menu_writes_no_state(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test refetching the same menu does not write the sensor state."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={"days": [{"date": "2026-02-17", "menu_items": []}]},
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    menu = coordinator.data
+
+    with patch.object(NutrisliceSensor, "async_write_ha_state") as write_state:
+        await coordinator.async_refresh()
+        assert not coordinator.menu_changed
+        assert coordinator.data is menu
+        write_state.assert_not_called()
+
+        # A parse of the same content renders the same
+        coordinator.async_set_updated_data(
+            NutrisliceMenu.from_weeks(
+                {"current_week": {"days": [{"date": "2026-02-17"}]}}
+            )
+        )
+        write_state.assert_not_called()
+
+        coordinator.async_set_updated_data(
+            NutrisliceMenu.from_weeks(
+                {"current_week": {"days": [{"date": "2026-02-18"}]}}
+            )
+        )
+        write_state.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_category_sensors(
+    hass: HomeAssistant,
+    aioclient_mock: AiohttpClientMocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test each selected category gets sensors fed by the shared menu."""
+    freezer.move_to("2026-02-17 08:00:00")
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={
+            "days": [
+                {
+                    "date": "2026-02-17",
+                    "menu_items": [
+                        {
+                            "food": {
+                                "name": "Menu Subject to Change",
+                                "food_category": "entree",
+                            }
+                        },
+                        {"food": {"name": " ", "food_category": "entree"}},
+                        {"food": {"name": "Pizza", "food_category": "entree"}},
+                        {"food": {"name": "Burger", "food_category": "entree"}},
+                        {"food": {"name": "Apple", "food_category": "fruit"}},
+                    ],
+                }
+            ]
+        },
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+            "categories": ["entree", "sides"],
+        },
+        options={"category_count_sensors": True},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # One request per week, whatever the number of sensors
+    assert aioclient_mock.call_count == 3
+
+    # Items hidden from the day summary are not listed...
+    state = hass.states.get("sensor.elementary_school_lunch_entree")
+    assert state.state == "Pizza, Burger"
+    assert state.attributes["items"] == ["Pizza", "Burger"]
+    assert hass.states.get("sensor.elementary_school_lunch_sides").state == "Apple"
+    # ...but still counted, as they always were
+    assert hass.states.get("sensor.elementary_school_lunch_entree_count").state == "4"
+    assert hass.states.get("sensor.elementary_school_lunch_sides_count").state == "1"
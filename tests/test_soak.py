@@ -0,0 +1,184 @@
+"""Integration and soak tests against a local stand-in for the Nutrislice API.
+
+The soak test sets up many entries at once and reports the event loop lag,
+the requests sent, the peak memory and the time until every entity has a
+state. It takes a while, so it only runs when given a number of entries:
+
+    NUTRISLICE_SOAK_ENTRIES=200 pytest tests/test_soak.py -o log_cli=true
+"""
+
+import asyncio
+import logging
+import os
+import time
+import tracemalloc
+from collections.abc import AsyncIterator, Callable
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.nutrislice.api import week_start
+from custom_components.nutrislice.const import DOMAIN, MAX_REQUESTS_PER_HOST
+
+from .fake_nutrislice import FakeNutrislice
+
+_LOGGER = logging.getLogger(__name__)
+
+SOAK_ENTRIES = int(os.environ.get("NUTRISLICE_SOAK_ENTRIES", "0"))
+SCHOOLS_PER_DISTRICT = 10
+
+
+@pytest.fixture
+async def fake_nutrislice(socket_enabled: None) -> AsyncIterator[FakeNutrislice]:
+    """Serve the API locally and point the integration at it."""
+    fake = FakeNutrislice()
+    await fake.start()
+    with patch("custom_components.nutrislice.api.API_BASE_URL", fake.base_url):
+        yield fake
+    await fake.close()
+
+
+def _entry(district: str, school_name: str, meal_type: str) -> MockConfigEntry:
+    """Return an entry for a school menu."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=f"{district}_{school_name}_{meal_type}",
+        data={
+            "district": district,
+            "school_name": school_name,
+            "meal_type": meal_type,
+            "categories": ["entree", "sides"],
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_refresh_against_fake_api(
+    hass: HomeAssistant, fake_nutrislice: FakeNutrislice
+) -> None:
+    """Test unpublished weeks and conditional requests end to end."""
+    today = dt_util.now().date()
+    fake_nutrislice.config.published_until = week_start(today)
+    entry = _entry("my-district", "elementary-school", "lunch")
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    assert coordinator.data.weeks["current_week"] is not None
+    assert coordinator.data.weeks["next_week"] is None
+    assert fake_nutrislice.stats.not_found == 1
+
+    # Refetching within the shared results does not reach the API...
+    requests = fake_nutrislice.stats.requests
+    await coordinator.async_refresh()
+    assert fake_nutrislice.stats.requests == requests
+
+    # ...and afterwards the unchanged weeks answer 304
+    coordinator._registry._results.clear()
+    await coordinator.async_refresh()
+    assert fake_nutrislice.stats.not_modified == 1
+    assert not coordinator.menu_changed
+
+
+@pytest.mark.skipif(
+    not SOAK_ENTRIES, reason="Set NUTRISLICE_SOAK_ENTRIES to run the soak test"
+)
+@pytest.mark.asyncio
+async def test_soak(
+    hass: HomeAssistant,
+    fake_nutrislice: FakeNutrislice,
+    record_property: Callable[[str, object], None],
+) -> None:
+    """Set up many entries at once and report what it costs.
+
+    Memory is traced while the entries set up, which slows the loop, so the
+    reported times are upper bounds. Every district is served from the same
+    local host here, so the per-host request cap applies to all of them
+    together.
+    """
+    fake_nutrislice.config.latency = 0.005
+    fake_nutrislice.config.jitter = 0.02
+    entries = [
+        _entry(
+            f"district-{number // (2 * SCHOOLS_PER_DISTRICT)}",
+            f"school-{number // 2 % SCHOOLS_PER_DISTRICT}",
+            ("lunch", "breakfast")[number % 2],
+        )
+        for number in range(SOAK_ENTRIES)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+
+    loop = asyncio.get_running_loop()
+    # Tests run the loop in debug mode, which records a traceback for every
+    # callback. Measure it as it runs in production.
+    debug = loop.get_debug()
+    loop.set_debug(False)
+    max_lag = 0.0
+    monitoring = True
+
+    async def monitor_lag() -> None:
+        nonlocal max_lag
+        while monitoring:
+            expected = loop.time() + 0.005
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, loop.time() - expected)
+
+    monitor = asyncio.create_task(monitor_lag())
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        assert await async_setup_component(hass, DOMAIN, {})
+        await hass.async_block_till_done()
+        ready_after = time.perf_counter() - started
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        monitoring = False
+        await monitor
+        loop.set_debug(debug)
+
+    states = hass.states.async_all("sensor")
+    stats = fake_nutrislice.stats
+    report = {
+        "entries": SOAK_ENTRIES,
+        "ready_after": ready_after,
+        "requests": stats.requests,
+        "peak_in_flight": stats.peak_in_flight,
+        "bytes_sent": stats.bytes_sent,
+        "peak_memory": peak_memory,
+        "max_loop_lag": max_lag,
+    }
+    for name, value in report.items():
+        record_property(name, value)
+    _LOGGER.info(
+        "%s entries ready in %.2fs, %s requests (%s at once), %.1f MiB served, "
+        "peak memory %.1f MiB, max loop lag %.0fms",
+        SOAK_ENTRIES,
+        ready_after,
+        stats.requests,
+        stats.peak_in_flight,
+        stats.bytes_sent / 2**20,
+        peak_memory / 2**20,
+        max_lag * 1000,
+    )
+
+    # Every entity has a menu
+    assert len(states) == SOAK_ENTRIES * 3
+    assert all(state.state != STATE_UNAVAILABLE for state in states)
+    # One request per week of each entry, none repeated
+    assert stats.requests == len(stats.paths) == SOAK_ENTRIES * 3
+    assert stats.peak_in_flight <= MAX_REQUESTS_PER_HOST
+    # Generous bounds, tracing memory slows everything down: these catch
+    # setup blocking the loop or memory held per raw week rather than
+    # regressions of a few percent
+    assert max_lag < 5
+    assert peak_memory < SOAK_ENTRIES * 2**19
+    assert ready_after < timedelta(minutes=1).total_seconds()
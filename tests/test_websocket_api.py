@@ -0,0 +1,105 @@
+"""Test the Nutrislice WebSocket API."""
+
+import re
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.nutrislice.const import DOMAIN
+
+
+@pytest.fixture
+async def entry(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> MockConfigEntry:
+    """Set up an entry whose API returns the same week for every date."""
+    aioclient_mock.get(
+        re.compile(r"https://my-district\.api\.nutrislice\.com/.*"),
+        json={
+            "days": [
+                {
+                    "date": "2025-01-06",
+                    "menu_items": [
+                        {"food": {"name": "Pizza", "food_category": "entree"}}
+                    ],
+                }
+            ]
+        },
+    )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "district": "my-district",
+            "school_name": "elementary-school",
+            "meal_type": "lunch",
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_get_menu_outside_window(
+    hass: HomeAssistant,
+    hass_ws_client,
+    aioclient_mock: AiohttpClientMocker,
+    entry: MockConfigEntry,
+) -> None:
+    """Test weeks outside the refresh window are fetched once and cached."""
+    client = await hass_ws_client(hass)
+    calls = aioclient_mock.call_count
+
+    for msg_id in (1, 2):
+        await client.send_json(
+            {
+                "id": msg_id,
+                "type": "nutrislice/menu",
+                "entry_id": entry.entry_id,
+                "start_date": "2025-01-05",
+                "end_date": "2025-01-11",
+            }
+        )
+        msg = await client.receive_json()
+        assert msg["success"]
+        assert [day["date"] for day in msg["result"]["days"]] == ["2025-01-06"]
+        assert msg["result"]["days"][0]["menu_summary"] == "Pizza"
+
+    assert aioclient_mock.call_count == calls + 1
+
+
+@pytest.mark.asyncio
+async def test_get_menu_errors(
+    hass: HomeAssistant, hass_ws_client, entry: MockConfigEntry
+) -> None:
+    """Test unknown entries and invalid ranges are rejected."""
+    client = await hass_ws_client(hass)
+
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "nutrislice/menu",
+            "entry_id": "unknown",
+            "start_date": "2025-01-05",
+            "end_date": "2025-01-11",
+        }
+    )
+    msg = await client.receive_json()
+    assert msg["error"]["code"] == "not_found"
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": "nutrislice/menu",
+            "entry_id": entry.entry_id,
+            "start_date": "2025-01-11",
+            "end_date": "2025-01-05",
+        }
+    )
+    msg = await client.receive_json()
+    assert msg["error"]["code"] == "invalid_format"